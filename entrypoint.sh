@@ -6,7 +6,13 @@ until python -c "import psycopg2; psycopg2.connect(dbname='${DB_NAME:-tenders}',
   sleep 2
 done
 
+# Run another command (e.g. the bulk upload worker) in place of the web server
+if [ "$#" -gt 0 ]; then
+  exec "$@"
+fi
+
 python manage.py migrate --noinput
+python manage.py createcachetable
 python manage.py collectstatic --noinput
 
 exec gunicorn tender_tracking.wsgi:application --bind 0.0.0.0:8000 --workers 3
\ No newline at end of file
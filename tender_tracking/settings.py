@@ -142,6 +142,37 @@ LOGOUT_REDIRECT_URL = 'tenders:landing'
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caches
+# default is shared by every process (web workers, upload worker, importer) and
+# holds the cached creator roles (see tenders/roles.py); create its table with
+# python manage.py createcachetable
+# tender_rows holds pre-rendered tender list rows (see tenders/renderers.py), about
+# 1.6 KB per tender. Set TENDER_ROW_CACHE_REDIS_URL (e.g. redis://redis:6379/1) to keep
+# one copy in Redis shared by every web worker. Without it each process keeps its own
+# LocMemCache of up to TENDER_ROW_CACHE_MAX_ENTRIES rows, about 8 MB per gunicorn
+# worker at the default. A list longer than the bound gets little from the cache, so
+# only raise it towards the tender count if every worker can spare 1.6 KB per tender
+# (80 MB each for 50,000); python manage.py benchmark_tender_list reports the sizes.
+TENDER_ROW_CACHE_REDIS_URL = os.getenv('TENDER_ROW_CACHE_REDIS_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'tenders_cache',
+    },
+    'tender_rows': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': TENDER_ROW_CACHE_REDIS_URL,
+        'TIMEOUT': int(os.getenv('TENDER_ROW_CACHE_TIMEOUT', '3600')),
+    } if TENDER_ROW_CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tender-rows',
+        'TIMEOUT': int(os.getenv('TENDER_ROW_CACHE_TIMEOUT', '3600')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('TENDER_ROW_CACHE_MAX_ENTRIES', '5000')),
+        },
+    },
+}
+
 # Requisition settings
 REQUISITION_CREATION_DEADLINE_DAYS = int(os.getenv('REQUISITION_CREATION_DEADLINE_DAYS', '7'))
 
@@ -151,3 +182,38 @@ CSRF_TRUSTED_ORIGINS = [
     'http://127.0.0.1:8080',
     'http://localhost:8080',
 ]
+
+# Role resolution settings (see tenders/roles.py)
+ROLE_CACHE_TIMEOUT = int(os.getenv('ROLE_CACHE_TIMEOUT', '300'))
+TENDER_CREATOR_SECTION = os.getenv('TENDER_CREATOR_SECTION', 'tenders')
+TENDER_CREATOR_DIVISION = os.getenv('TENDER_CREATOR_DIVISION', 'procurement')
+CONTRACT_CREATOR_SECTION = os.getenv('CONTRACT_CREATOR_SECTION', 'contract')
+CONTRACT_CREATOR_DIVISION = os.getenv('CONTRACT_CREATOR_DIVISION', 'compliance & reporting')
+
+# Browser cache lifetime (seconds) for the requisition owner options endpoint
+EMPLOYEE_OPTIONS_MAX_AGE = int(os.getenv('EMPLOYEE_OPTIONS_MAX_AGE', '300'))
+# Most employees the owner list renders or the options endpoint returns; search narrows the rest
+EMPLOYEE_OPTIONS_LIMIT = int(os.getenv('EMPLOYEE_OPTIONS_LIMIT', '200'))
+
+# Rows rendered per chunk when streaming the requisition and employee lists
+LIST_STREAM_CHUNK_SIZE = int(os.getenv('LIST_STREAM_CHUNK_SIZE', '200'))
+
+# Rows written per transaction by the bulk upload views
+BULK_UPLOAD_BATCH_SIZE = int(os.getenv('BULK_UPLOAD_BATCH_SIZE', '500'))
+
+# Bulk uploads are queued as jobs for the process_upload_jobs worker.
+# Set BULK_UPLOAD_IN_BACKGROUND=False to process them inside the request instead.
+BULK_UPLOAD_IN_BACKGROUND = os.getenv('BULK_UPLOAD_IN_BACKGROUND', 'True') == 'True'
+BULK_UPLOAD_PROGRESS_INTERVAL = float(os.getenv('BULK_UPLOAD_PROGRESS_INTERVAL', '1'))
+BULK_UPLOAD_STATUS_ERROR_LIMIT = int(os.getenv('BULK_UPLOAD_STATUS_ERROR_LIMIT', '100'))
+# A running job that has reported no progress for this many seconds is taken to belong
+# to a stopped worker and is claimed again, resuming from its checkpoint
+BULK_UPLOAD_JOB_LEASE = int(os.getenv('BULK_UPLOAD_JOB_LEASE', '300'))
+
+# On PostgreSQL, employee uploads are merged through COPY into a staging table,
+# in chunks of BULK_UPLOAD_COPY_BATCH_SIZE rows. Set BULK_UPLOAD_USE_COPY=False to use bulk_create.
+BULK_UPLOAD_USE_COPY = os.getenv('BULK_UPLOAD_USE_COPY', 'True') == 'True'
+BULK_UPLOAD_COPY_BATCH_SIZE = int(os.getenv('BULK_UPLOAD_COPY_BATCH_SIZE', '10000'))
+
+# Drop folder watched by watch_tender_imports for Procurement Tracking exports
+TENDER_IMPORT_WATCH_DIR = os.getenv('TENDER_IMPORT_WATCH_DIR', str(BASE_DIR / 'imports'))
@@ -3,7 +3,7 @@ from .models import (
     Region, Department, Division, Section,
     LOAStatus, ContractStatus, Employee, Tender, Contract, Requisition,
     TenderOpeningCommittee, TenderEvaluationCommittee, ContractCITCommittee, UserProfile,
-    Currency, Country
+    Currency, Country, BulkUploadJob, ImportCheckpoint, TenderImportRun
 )
 
 # Register your models here.
@@ -290,3 +290,26 @@ class ContractCITCommitteeAdmin(admin.ModelAdmin):
     list_filter = ['role', 'added_at']
     search_fields = ['contract__tender__tender_id', 'employee__first_name', 'employee__last_name']
     autocomplete_fields = ['contract', 'employee']
+
+
+@admin.register(BulkUploadJob)
+class BulkUploadJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'upload_type', 'status', 'rows_processed', 'total_rows', 'requested_by', 'created_at', 'finished_at']
+    list_filter = ['upload_type', 'status', 'created_at']
+    search_fields = ['file', 'requested_by__username']
+    readonly_fields = ['started_at', 'finished_at', 'created_at', 'updated_at']
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['source', 'file_hash', 'last_row', 'updated_at']
+    list_filter = ['source']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(TenderImportRun)
+class TenderImportRunAdmin(admin.ModelAdmin):
+    list_display = ['id', 'file_name', 'status', 'worker', 'started_at', 'finished_at']
+    list_filter = ['status', 'started_at']
+    search_fields = ['file_name']
+    readonly_fields = ['started_at', 'finished_at']
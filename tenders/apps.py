@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TendersConfig(AppConfig):
     name = 'tenders'
+
+    def ready(self):
+        from . import roles  # noqa: F401 - registers role version signals
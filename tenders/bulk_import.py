@@ -0,0 +1,651 @@
+"""
+Declarative bulk import engine for the Admin Panel uploads.
+
+Each upload type is a BulkImport subclass that declares its model, the
+columns it reads, the natural key that identifies a record and the foreign
+keys it resolves by name. One engine does the rest for all of them: the file
+is parsed as a stream of rows, references are resolved against maps loaded
+once, rows are validated a batch at a time and valid rows are upserted with
+bulk_create, each chunk committed together with its checkpoint. On
+PostgreSQL an import can instead merge each chunk through a COPY into an
+unlogged staging table, which is much faster for very large files.
+"""
+import codecs
+import csv
+import io
+import uuid
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.db.models import DateTimeField
+from openpyxl import load_workbook
+
+from .checkpoints import checkpoint_errors, save_checkpoint
+from .dates import parse_date, parse_time
+from .models import (
+    Region, Department, Division, Section,
+    LOAStatus, ContractStatus, Employee
+)
+from .roles import bump_role_version_on_commit
+
+
+# Parsing
+
+def iter_text_lines(file, encoding='utf-8-sig'):
+    """Decode an uploaded file chunk by chunk and yield it line by line"""
+    pending = ''
+    for text in codecs.iterdecode(file.chunks(), encoding):
+        pending += text
+        if '\n' not in pending:
+            continue
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+    if pending:
+        yield pending
+
+
+def normalise_rows(rows, headers, columns):
+    """Yield dictionaries keyed by the column names, mapping header positions once; absent columns are blank"""
+    column_indexes = [(col, headers.index(col.lower()) if col.lower() in headers else None) for col in columns]
+    # Rows are numbered as a spreadsheet shows them, with the header as row 1
+    for row_number, row in enumerate(rows, 2):
+        if not any(cell.strip() for cell in row):
+            continue
+        values = {
+            col: row[index].strip() if index is not None and index < len(row) and row[index] else ''
+            for col, index in column_indexes
+        }
+        values['row_number'] = row_number
+        yield values
+
+
+def iter_batches(rows, batch_size=None):
+    """Group a row iterator into lists of at most batch_size rows"""
+    batch_size = batch_size or getattr(settings, 'BULK_UPLOAD_BATCH_SIZE', 500)
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def process_csv_file(file, columns, optional_columns=()):
+    """Validate the CSV header and return a generator of normalised row dictionaries"""
+    reader = csv.reader(iter_text_lines(file))
+    fieldnames = next(reader, None)
+    if not fieldnames:
+        raise ValueError(f"CSV file has no headers")
+
+    # Normalize headers (strip whitespace and lowercase)
+    headers = [field.strip().lower() for field in fieldnames]
+    missing_columns = [col for col in columns if col.lower() not in headers]
+    if missing_columns:
+        raise ValueError(f"CSV must contain columns: {', '.join(columns)}. Found: {', '.join(fieldnames)}")
+
+    return normalise_rows(reader, headers, [*columns, *optional_columns])
+
+
+def process_excel_file(file, columns, optional_columns=()):
+    """Validate the Excel header and return a generator of normalised row dictionaries"""
+    wb = load_workbook(file, read_only=True, data_only=True)
+    ws = wb.active
+    rows = ws.iter_rows(values_only=True)
+
+    # Get headers from first row and normalize them
+    headers = [str(value).strip() if value is not None else '' for value in next(rows, ())]
+    normalized_headers = [header.lower() for header in headers]
+
+    # Validate headers
+    missing_columns = [col for col in columns if col.lower() not in normalized_headers]
+    if missing_columns:
+        wb.close()
+        raise ValueError(f"Excel file must contain columns: {', '.join(columns)}. Found: {', '.join(headers)}")
+
+    def iter_cells():
+        try:
+            for row in rows:
+                yield ['' if value is None else str(value) for value in row]
+        finally:
+            wb.close()
+
+    return normalise_rows(iter_cells(), normalized_headers, [*columns, *optional_columns])
+
+
+def read_upload_file(file, columns, optional_columns=()):
+    """Pick the CSV or Excel parser from the file extension"""
+    if file.name.split('.')[-1].lower() == 'csv':
+        return process_csv_file(file, columns, optional_columns)
+    return process_excel_file(file, columns, optional_columns)
+
+
+def estimate_row_count(file):
+    """Estimate the number of data rows in an upload for progress reporting, or None if unknown"""
+    if file.name.split('.')[-1].lower() == 'csv':
+        lines = sum(chunk.count(b'\n') for chunk in file.chunks())
+        return max(lines - 1, 0)
+    wb = load_workbook(file, read_only=True)
+    try:
+        max_row = wb.active.max_row
+    finally:
+        wb.close()
+    return max(max_row - 1, 0) if max_row else None
+
+
+# Declarations
+
+def copy_text(value):
+    """Format a value for COPY FROM STDIN in PostgreSQL's text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def row_error(row, column, error):
+    return {'row': row['row_number'], 'column': column, 'error': error}
+
+
+# Parsers for model fields that do not take the column text as it is, with the error for a value they cannot read
+FIELD_PARSERS = {
+    'DateField': (parse_date, 'Enter a valid date.'),
+    'TimeField': (parse_time, 'Enter a valid time.'),
+}
+
+
+class Reference:
+    """
+    A foreign key filled by looking up the referenced model by name.
+
+    scope is an optional (lookup, column) pair naming the record's parent, e.g.
+    ('department__name', 'department_name'): when a row fills that column the
+    name is looked up within that parent only, which settles names that are
+    shared across parents. If an earlier reference of the same import has
+    already resolved the parent to an id, the name is looked up under that
+    parent record, so the two always agree.
+    """
+
+    def __init__(self, field, model, column, required=True, casefold=False, scope=None):
+        self.field = field
+        self.model = model
+        self.column = column
+        self.required = required
+        self.casefold = casefold
+        self.scope = scope
+        self.parent = scope[0].split('__')[0] if scope else None
+
+    def normalise(self, name):
+        return name.casefold() if self.casefold else name
+
+    def load(self):
+        """
+        Map each (normalised) name, and if scoped each (parent name, name) and
+        (parent id, name) pair, to the ids of the records that have it
+        """
+        ids = {}
+        lookups = ['id', 'name', self.scope[0], f'{self.parent}_id'] if self.scope else ['id', 'name']
+        for pk, name, *parent in self.model.objects.values_list(*lookups):
+            ids.setdefault(self.normalise(name), []).append(pk)
+            if parent and parent[1] is not None:
+                ids.setdefault((self.normalise(parent[0]), self.normalise(name)), []).append(pk)
+                ids.setdefault((parent[1], self.normalise(name)), []).append(pk)
+        return ids
+
+    def resolve(self, row, ids):
+        """Return (id, error) for the row; both are None when an optional name is blank"""
+        name = row[self.column]
+        verbose_name = self.model._meta.verbose_name
+        if not name:
+            return None, 'This field is required.' if self.required else None
+        parent = row.get(self.scope[1]) if self.scope else ''
+        parent_id = row.get(f'{self.parent}_id') if self.scope else None
+        if parent_id is not None:
+            matches = ids.get((parent_id, self.normalise(name)), [])
+            if not matches:
+                return None, f"{verbose_name.capitalize()} '{name}' not found in {self.parent} '{parent}'."
+        elif parent:
+            matches = ids.get((self.normalise(parent), self.normalise(name)), [])
+            if not matches:
+                return None, f"{verbose_name.capitalize()} '{name}' not found in {self.scope[0].split('__')[0]} '{parent}'."
+        else:
+            matches = ids.get(self.normalise(name), [])
+            if not matches:
+                return None, f"{verbose_name.capitalize()} '{name}' not found."
+        if len(matches) > 1:
+            hint = f'Fill in {self.scope[1]} to choose one.' if self.scope else 'Please be more specific.'
+            return None, f"Multiple {self.model._meta.verbose_name_plural} found with name '{name}'. {hint}"
+        return matches[0], None
+
+
+class BulkImport:
+    """
+    Declarative description of one bulk upload type.
+
+    model           model the rows are written to
+    columns         columns the file must have
+    optional_columns  columns read when the file has them, blank otherwise
+    fields          model fields filled from the column of the same name
+    required        fields that may not be blank
+    references      Reference declarations for foreign keys given by name
+    natural_key     fields (or reference fields) identifying an existing record
+    update_existing update records that already exist (update_or_create) rather
+                    than leave them alone (get_or_create)
+    changes_roles   the model feeds tenders.roles, whose role version bulk writes must bump
+    use_copy        on PostgreSQL, write chunks with COPY and INSERT ... ON CONFLICT
+                    instead of bulk_create (see copy_upsert)
+
+    A clean_<field>(value) method converts a column value for its model field;
+    date and time fields are read with tenders.dates when there is none.
+    clean_row(row, state) may add checks of its own.
+    """
+    model = None
+    columns = []
+    optional_columns = []
+    fields = []
+    required = []
+    references = []
+    natural_key = []
+    update_existing = True
+    changes_roles = False
+    use_copy = False
+
+    title = ''
+    model_name = ''
+    example_data = ''
+    message = ''
+
+    def copy_enabled(self):
+        return self.use_copy and connection.vendor == 'postgresql' and getattr(settings, 'BULK_UPLOAD_USE_COPY', True)
+
+    def batch_size(self):
+        if self.copy_enabled():
+            return getattr(settings, 'BULK_UPLOAD_COPY_BATCH_SIZE', 10000)
+        return getattr(settings, 'BULK_UPLOAD_BATCH_SIZE', 500)
+
+    def read(self, file):
+        """Return the rows of an uploaded CSV or Excel file as normalised dictionaries"""
+        return read_upload_file(file, self.columns, self.optional_columns)
+
+    # Loading and validation
+
+    def load_state(self):
+        """Reference maps and any other state shared by every batch of one import"""
+        return {reference.field: reference.load() for reference in self.references}
+
+    def validate(self, batch, state):
+        """Split a batch into valid rows and the {row, column, error} errors of the rest"""
+        valid = []
+        errors = []
+        for row in batch:
+            row_errors = self.check_fields(row)
+            for reference in self.references:
+                pk, error = reference.resolve(row, state[reference.field])
+                if error:
+                    row_errors.append(row_error(row, reference.column, error))
+                elif pk is not None:
+                    row[f'{reference.field}_id'] = pk
+            row_errors += self.clean_row(row, state, row_errors)
+            if row_errors:
+                errors.extend(row_errors)
+            else:
+                valid.append(row)
+        return valid, errors
+
+    def check_fields(self, row):
+        """Return errors for required values that are missing and values too long for their field"""
+        errors = []
+        for field_name in self.fields:
+            value = row.get(field_name, '')
+            if not value:
+                if field_name in self.required:
+                    errors.append(row_error(row, field_name, 'This field is required.'))
+                continue
+            field = self.model._meta.get_field(field_name)
+            if field.max_length and len(value) > field.max_length:
+                errors.append(row_error(row, field_name, f'Ensure this value has at most {field.max_length} characters (it has {len(value)}).'))
+            parser, error = FIELD_PARSERS.get(field.get_internal_type(), (None, None))
+            if parser and not hasattr(self, f'clean_{field_name}') and parser(value) is None:
+                errors.append(row_error(row, field_name, error))
+        return errors
+
+    def clean_row(self, row, state, errors):
+        return []
+
+    # Writing
+
+    def key_attnames(self):
+        return [self.model._meta.get_field(field).attname for field in self.natural_key]
+
+    def build(self, row):
+        """Return the model values for a valid row, keyed by attname, and the fields it may update"""
+        values = {}
+        for field_name in self.fields:
+            clean = getattr(self, f'clean_{field_name}', None)
+            if clean is None:
+                clean, _ = FIELD_PARSERS.get(self.model._meta.get_field(field_name).get_internal_type(), (None, None))
+            values[field_name] = clean(row[field_name]) if clean else row[field_name]
+        resolved = []
+        for reference in self.references:
+            if f'{reference.field}_id' in row:
+                values[f'{reference.field}_id'] = row[f'{reference.field}_id']
+                resolved.append(reference.field)
+        # Optional references left blank keep the value already stored
+        update_fields = [
+            field for field in [*self.fields, *resolved]
+            if field not in self.natural_key
+        ]
+        return values, tuple(update_fields)
+
+    def upsert(self, rows):
+        """Write a chunk of valid rows and return (created, updated) counts"""
+        attnames = self.key_attnames()
+        records = {}
+        for row in rows:
+            values, update_fields = self.build(row)
+            key = tuple(values[attname] for attname in attnames)
+            if key in records:
+                # A later row for the same record overrides the values it sets, as a second
+                # update_or_create would, and leaves the earlier row's other references in place
+                earlier_values, earlier_fields = records[key]
+                values = {**earlier_values, **values}
+                update_fields = tuple(dict.fromkeys([*earlier_fields, *update_fields]))
+            records[key] = (values, update_fields)
+
+        if not records:
+            return 0, 0
+        if self.copy_enabled():
+            counts = self.copy_upsert(records)
+        else:
+            counts = self.orm_upsert(records)
+        if self.changes_roles:
+            bump_role_version_on_commit()
+        return counts
+
+    def orm_upsert(self, records):
+        """Write records with bulk_create, counting existing ones with a single query"""
+        attnames = self.key_attnames()
+        filters = {f'{attname}__in': {key[i] for key in records} for i, attname in enumerate(attnames)}
+        existing = set(self.model.objects.filter(**filters).values_list(*attnames)) & records.keys()
+        batch_size = getattr(settings, 'BULK_UPLOAD_BATCH_SIZE', 500)
+
+        if self.update_existing:
+            # Rows that update different fields are written in separate statements
+            groups = {}
+            for values, update_fields in records.values():
+                groups.setdefault(update_fields, []).append(self.model(**values))
+            for update_fields, instances in groups.items():
+                self.model.objects.bulk_create(
+                    instances,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=self.natural_key,
+                    update_fields=[*update_fields, 'updated_at'],
+                )
+        else:
+            new = [self.model(**values) for key, (values, _) in records.items() if key not in existing]
+            self.model.objects.bulk_create(new, batch_size=batch_size, ignore_conflicts=True)
+        return len(records) - len(existing), len(existing)
+
+    def copy_upsert(self, records):
+        """
+        Write records on PostgreSQL by streaming them with COPY into an unlogged
+        staging table and merging that with one INSERT ... SELECT ... ON CONFLICT.
+
+        References are staged as the ids validation resolved them to; a blank
+        optional reference is staged as NULL and keeps the stored value.
+        """
+        opts = self.model._meta
+        quote = connection.ops.quote_name
+        staged = [opts.get_field(name) for name in [*self.fields, *(reference.field for reference in self.references)]]
+        optional = {opts.get_field(reference.field).column for reference in self.references if not reference.required}
+        key_columns = [opts.get_field(name).column for name in self.natural_key]
+        columns = [field.column for field in staged]
+        timestamps = [
+            field for field in opts.concrete_fields
+            if isinstance(field, DateTimeField) and (field.auto_now or field.auto_now_add)
+        ]
+
+        table = quote(opts.db_table)
+        staging = quote(f'{opts.db_table}_staging_{uuid.uuid4().hex[:12]}')
+        column_list = ', '.join(quote(column) for column in columns)
+
+        if self.update_existing:
+            assignments = [
+                f'{quote(column)} = COALESCE(EXCLUDED.{quote(column)}, {table}.{quote(column)})'
+                if column in optional else f'{quote(column)} = EXCLUDED.{quote(column)}'
+                for column in columns if column not in key_columns
+            ]
+            assignments += [f'{quote(field.column)} = EXCLUDED.{quote(field.column)}' for field in timestamps if field.auto_now]
+            conflict = f'ON CONFLICT ({", ".join(quote(column) for column in key_columns)}) DO UPDATE SET {", ".join(assignments)}'
+        else:
+            conflict = 'ON CONFLICT DO NOTHING'
+
+        buffer = io.StringIO()
+        attnames = [field.attname for field in staged]
+        for values, _ in records.values():
+            buffer.write('\t'.join(copy_text(values.get(attname)) for attname in attnames) + '\n')
+        buffer.seek(0)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE UNLOGGED TABLE {staging} AS SELECT {column_list} FROM {table} WITH NO DATA')
+            cursor.copy_expert(f'COPY {staging} ({column_list}) FROM STDIN', buffer)
+            # xmax is 0 on rows the INSERT created and set on rows ON CONFLICT updated
+            cursor.execute(
+                f'WITH merged AS ('
+                f'INSERT INTO {table} ({column_list}{"".join(", " + quote(field.column) for field in timestamps)}) '
+                f'SELECT {column_list}{", now()" * len(timestamps)} FROM {staging} '
+                f'{conflict} RETURNING (xmax = 0) AS inserted'
+                f') SELECT COUNT(*) FILTER (WHERE inserted) FROM merged'
+            )
+            created = cursor.fetchone()[0]
+            cursor.execute(f'DROP TABLE {staging}')
+        return created, len(records) - created
+
+    # Running
+
+    def run(self, rows, dry_run=False, checkpoint=None, heartbeat=None):
+        """
+        Validate rows in one pass and import the valid ones, a chunk per transaction.
+
+        Invalid rows are skipped and reported as {'row', 'column', 'error'} dictionaries.
+        With a checkpoint, rows it has already committed are skipped and each chunk
+        advances it in the same transaction. heartbeat, if given, is called after
+        each chunk, inside its transaction when one is written. With dry_run
+        nothing is written. Returns (summary message, errors).
+        """
+        state = self.load_state()
+        counters = Counter({'created': 0, 'updated': 0, 'valid': 0})
+        errors = []
+        resumed_from = 0
+        if checkpoint is not None:
+            counters.update(checkpoint.counters)
+            errors = checkpoint_errors(checkpoint)
+            resumed_from = checkpoint.last_row
+            rows = (row for row in rows if row['row_number'] > resumed_from)
+
+        for batch in iter_batches(rows, self.batch_size()):
+            valid, batch_errors = self.validate(batch, state)
+            errors.extend(batch_errors)
+            counters['valid'] += len(valid)
+            if dry_run:
+                if heartbeat is not None:
+                    heartbeat()
+                continue
+            with transaction.atomic():
+                created, updated = self.upsert(valid)
+                counters['created'] += created
+                counters['updated'] += updated
+                if checkpoint is not None:
+                    save_checkpoint(checkpoint, batch[-1]['row_number'], counters, batch_errors)
+                if heartbeat is not None:
+                    heartbeat()
+
+        invalid_count = len({error['row'] for error in errors})
+        if dry_run:
+            return f'Validation complete: {counters["valid"]} valid rows and {invalid_count} rows with errors. No changes were made.', errors
+
+        message = self.message.format(**counters)
+        if resumed_from:
+            message += f' Resumed after row {resumed_from}, the last row committed by an earlier attempt.'
+        if invalid_count:
+            message += f' Skipped {invalid_count} invalid rows; download the error report for details.'
+        return message, errors
+
+
+class RegionImport(BulkImport):
+    model = Region
+    columns = ['name']
+    fields = ['name']
+    required = ['name']
+    natural_key = ['name']
+    title = 'Bulk Upload Regions'
+    model_name = 'Region'
+    example_data = 'Western Region\nEastern Region\nCentral Region'
+    message = 'Successfully processed {created} new regions and updated {updated} existing regions.'
+
+
+class DepartmentImport(BulkImport):
+    model = Department
+    columns = ['name']
+    fields = ['name']
+    required = ['name']
+    natural_key = ['name']
+    title = 'Bulk Upload Departments'
+    model_name = 'Department'
+    example_data = 'Human Resources\nFinance\nProcurement'
+    message = 'Successfully processed {created} new departments and updated {updated} existing departments.'
+
+
+class DivisionImport(BulkImport):
+    model = Division
+    columns = ['name', 'department_name']
+    fields = ['name']
+    required = ['name']
+    references = [Reference('department', Department, 'department_name')]
+    natural_key = ['department', 'name']
+    changes_roles = True
+    title = 'Bulk Upload Divisions'
+    model_name = 'Division'
+    example_data = 'Operations Division,Procurement\nStrategic Division,Human Resources'
+    message = 'Successfully processed {created} new divisions and updated {updated} existing divisions.'
+
+
+class SectionImport(BulkImport):
+    model = Section
+    columns = ['name', 'division_name']
+    optional_columns = ['department_name']
+    fields = ['name']
+    required = ['name']
+    # Division names repeat across departments; department_name picks the right one
+    references = [Reference('division', Division, 'division_name', scope=('department__name', 'department_name'))]
+    natural_key = ['division', 'name']
+    changes_roles = True
+    title = 'Bulk Upload Sections'
+    model_name = 'Section'
+    example_data = 'Tender Management,Operations Division,Procurement\nContract Admin,Operations Division,Procurement'
+    message = 'Successfully processed {created} new sections and updated {updated} existing sections.'
+
+
+class LOAStatusImport(BulkImport):
+    model = LOAStatus
+    columns = ['name']
+    fields = ['name']
+    required = ['name']
+    natural_key = ['name']
+    update_existing = False
+    title = 'Bulk Upload e-Contract Stepes'
+    model_name = 'e-Contract Step'
+    example_data = 'Pending\nApproved\nRejected'
+    message = 'Successfully processed {created} new e-Contract Stepes.'
+
+
+class ContractStatusImport(BulkImport):
+    model = ContractStatus
+    columns = ['name']
+    fields = ['name']
+    required = ['name']
+    natural_key = ['name']
+    update_existing = False
+    title = 'Bulk Upload e-Contract Statuses'
+    model_name = 'e-Contract Status'
+    example_data = 'Active\nExpired\nTerminated'
+    message = 'Successfully processed {created} new e-Contract Statuses.'
+
+
+class EmployeeImport(BulkImport):
+    model = Employee
+    columns = [
+        'employee_id', 'first_name', 'last_name', 'email', 'phone',
+        'department_name', 'division_name', 'section_name', 'job_title', 'is_active',
+    ]
+    fields = ['employee_id', 'first_name', 'last_name', 'email', 'phone', 'job_title', 'is_active']
+    required = ['employee_id', 'first_name', 'last_name', 'email']
+    references = [
+        Reference('department', Department, 'department_name', required=False, casefold=True),
+        # Division and section names repeat across their parents, e.g. the 'General' division
+        # import_tenders gives every department; each is looked up under the one before it
+        Reference('division', Division, 'division_name', required=False, casefold=True, scope=('department__name', 'department_name')),
+        Reference('section', Section, 'section_name', required=False, casefold=True, scope=('division__name', 'division_name')),
+    ]
+    natural_key = ['employee_id']
+    changes_roles = True
+    use_copy = True
+    title = 'Bulk Upload Employees'
+    model_name = 'Employee'
+    example_data = 'EMP001,John,Doe,john.doe@kengen.co.ke,0712345678,Finance,Accounts,Payroll,Accountant,true\\nEMP002,Jane,Smith,jane.smith@kengen.co.ke,0723456789,Engineering,Electrical,Generation,Engineer,true'
+    message = 'Successfully processed {created} new employees and updated {updated} existing employees.'
+
+    def clean_is_active(self, value):
+        return value.lower() in ['true', '1', 'yes', 'active'] if value else True
+
+    def load_state(self):
+        state = super().load_state()
+        # Employee ID owning each email seen so far, in the database or earlier in the file
+        state['email_owners'] = {}
+        # Department of each section, for rows that name a section and department but no division
+        state['section_departments'] = dict(Section.objects.values_list('id', 'division__department_id'))
+        return state
+
+    def validate(self, batch, state):
+        email_owners = state['email_owners']
+        new_emails = {row['email'] for row in batch if row['email']} - email_owners.keys()
+        email_owners.update(Employee.objects.filter(email__in=new_emails).values_list('email', 'employee_id'))
+        return super().validate(batch, state)
+
+    def clean_row(self, row, state, errors):
+        department_id, section_id = row.get('department_id'), row.get('section_id')
+        if department_id and section_id and not row.get('division_id'):
+            if state['section_departments'].get(section_id) != department_id:
+                return [row_error(row, 'section_name', f"Section '{row['section_name']}' not found in department '{row['department_name']}'.")]
+
+        email = row['email']
+        if not email:
+            return []
+        try:
+            validate_email(email)
+        except ValidationError:
+            return [row_error(row, 'email', 'Enter a valid email address.')]
+        email_owners = state['email_owners']
+        owner = email_owners.get(email)
+        if owner is not None and owner != row['employee_id']:
+            return [row_error(row, 'email', f"Email is already used by employee '{owner}'.")]
+        if not errors:
+            email_owners[email] = row['employee_id']
+        return []
+
+
+BULK_IMPORTS = {
+    'region': RegionImport(),
+    'department': DepartmentImport(),
+    'division': DivisionImport(),
+    'section': SectionImport(),
+    'loa_status': LOAStatusImport(),
+    'contract_status': ContractStatusImport(),
+    'employee': EmployeeImport(),
+}
@@ -12,6 +12,12 @@ class BulkUploadForm(forms.Form):
             'accept': '.csv,.xlsx,.xls'
         })
     )
+    dry_run = forms.BooleanField(
+        label='Validate only',
+        required=False,
+        help_text='Check every row and produce an error report without importing anything',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
     
     def clean_file(self):
         file = self.cleaned_data.get('file')
@@ -0,0 +1,60 @@
+"""
+Checkpoints for chunked, resumable imports.
+
+An import commits its rows in chunks and, in the same transaction as each
+chunk, records the last row committed and its running counters against the
+SHA-256 of the file. If the import fails, running it again on the same file
+skips the rows already committed instead of starting over. Row errors are
+stored with each chunk, so committing a chunk writes only its own errors, and
+are read back in order on resume. The checkpoint is removed once the import
+finishes.
+"""
+import hashlib
+
+from .models import ImportCheckpoint, ImportCheckpointErrors
+
+
+def file_sha256(file):
+    """Hash a Django File or binary file object, leaving it rewound"""
+    digest = hashlib.sha256()
+    chunks = file.chunks() if hasattr(file, 'chunks') else iter(lambda: file.read(64 * 1024), b'')
+    for chunk in chunks:
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def get_checkpoint(source, file_hash, restart=False):
+    """Return the checkpoint for this file, starting a new one if there is none or restart is set"""
+    checkpoint, created = ImportCheckpoint.objects.get_or_create(source=source, file_hash=file_hash)
+    if restart and not created:
+        checkpoint.last_row = 0
+        checkpoint.counters = {}
+        checkpoint.save()
+        checkpoint.error_chunks.all().delete()
+    return checkpoint
+
+
+def save_checkpoint(checkpoint, last_row, counters, errors=None):
+    """
+    Record a committed chunk and the row errors found in it; call inside the
+    chunk's transaction so both commit together
+    """
+    checkpoint.last_row = last_row
+    checkpoint.counters = dict(counters)
+    checkpoint.save(update_fields=['last_row', 'counters', 'updated_at'])
+    if errors:
+        ImportCheckpointErrors.objects.create(checkpoint=checkpoint, errors=list(errors))
+
+
+def checkpoint_errors(checkpoint):
+    """The row errors of every chunk the checkpoint has committed, in order"""
+    return [
+        error
+        for errors in checkpoint.error_chunks.order_by('pk').values_list('errors', flat=True)
+        for error in errors
+    ]
+
+
+def clear_checkpoint(checkpoint):
+    checkpoint.delete()
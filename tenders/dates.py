@@ -0,0 +1,93 @@
+"""
+Date and time parsing for imported spreadsheets.
+
+Exports write the same few hundred dates thousands of times, in a handful of
+formats ('9th September 2025', '2025-09-09', '09/09/2025' and times like
+'10.00 a.m' or '14:30'). Each format family is matched with one compiled
+regex instead of trying strptime formats in turn, and results are memoised,
+so a repeated value costs a dictionary lookup. Both functions return None for
+blank or unreadable values and leave reporting to the caller.
+"""
+import re
+from datetime import date, time
+from functools import lru_cache
+
+MONTHS = {
+    name: number for number, name in enumerate([
+        'january', 'february', 'march', 'april', 'may', 'june',
+        'july', 'august', 'september', 'october', 'november', 'december',
+    ], 1)
+}
+
+# 9th September 2025, 1st September 2025, 25 October 2025
+DAY_MONTH_NAME_YEAR = re.compile(r'(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]+)\s+(\d{4})', re.IGNORECASE)
+# 2025-09-09
+YEAR_MONTH_DAY = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+# 09/09/2025
+DAY_MONTH_YEAR = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+# 10.00 a.m, 10:00 AM
+TWELVE_HOUR = re.compile(r'(\d{1,2})[.:](\d{1,2})\s+(?:(am|a\.m)|(pm|p\.m))', re.IGNORECASE)
+# 14:30
+TWENTY_FOUR_HOUR = re.compile(r'(\d{1,2}):(\d{1,2})')
+
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(value):
+    """Parse a date in any of the export formats, or return None"""
+    if not value or not value.strip():
+        return None
+    value = value.strip()
+
+    match = DAY_MONTH_NAME_YEAR.fullmatch(value)
+    if match:
+        day, month_name, year = match.groups()
+        month = MONTHS.get(month_name.lower())
+        return make_date(year, month, day) if month else None
+    match = YEAR_MONTH_DAY.fullmatch(value)
+    if match:
+        year, month, day = match.groups()
+        return make_date(year, month, day)
+    match = DAY_MONTH_YEAR.fullmatch(value)
+    if match:
+        day, month, year = match.groups()
+        return make_date(year, month, day)
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_time(value):
+    """Parse a 12-hour time with a.m/p.m or a 24-hour time, or return None"""
+    if not value or not value.strip():
+        return None
+    value = value.strip()
+
+    match = TWELVE_HOUR.fullmatch(value)
+    if match:
+        hour, minute, am, pm = match.groups()
+        hour = int(hour)
+        if not 1 <= hour <= 12:
+            return None
+        # 12 a.m is midnight and 12 p.m is noon
+        return make_time(hour % 12 + (12 if pm else 0), minute)
+    match = TWENTY_FOUR_HOUR.fullmatch(value)
+    if match:
+        hour, minute = match.groups()
+        return make_time(hour, minute)
+    return None
+
+
+def make_date(year, month, day):
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:  # e.g. 31/02/2025
+        return None
+
+
+def make_time(hour, minute):
+    try:
+        return time(int(hour), int(minute))
+    except ValueError:
+        return None
@@ -2,18 +2,163 @@
 Forms for tenders app
 """
 from django import forms
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.forms.models import ModelChoiceIterator
+from django.utils.functional import SimpleLazyObject
 from .models import (
     Tender, Contract, TenderOpeningCommittee, TenderEvaluationCommittee,
     ContractCITCommittee, Region, Department, Division, Section,
     LOAStatus, ContractStatus, Employee, Requisition, Currency, Country
 )
+from .roles import get_contract_creator_ids, get_tender_creator_ids
 
 
 def get_employee_ordered_queryset():
     return Employee.objects.order_by('last_name', 'first_name', 'employee_id')
 
 
+def filter_employees_by_org(queryset, department_id=None, division_id=None, section_id=None):
+    """Narrow employees to the most specific org node given, or leave them all if no node is set"""
+    if section_id:
+        return queryset.filter(section_id=section_id)
+    if division_id:
+        return queryset.filter(division_id=division_id)
+    if department_id:
+        return queryset.filter(department_id=department_id)
+    return queryset
+
+
+def search_employees(queryset, query):
+    """Narrow employees to those whose name or staff number contains query"""
+    if not query:
+        return queryset
+    return queryset.filter(
+        Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(employee_id__icontains=query)
+    )
+
+
+def get_employee_options_limit():
+    return getattr(settings, 'EMPLOYEE_OPTIONS_LIMIT', 200)
+
+
+class LimitedModelChoiceIterator(ModelChoiceIterator):
+    """
+    Render at most limit choices, plus the selected one if it falls outside them.
+
+    The field still validates against its whole queryset; the rest of the
+    choices are fetched by searching the employee_options endpoint.
+    """
+
+    def __init__(self, field, limit, selected=None):
+        super().__init__(field)
+        self.limit = limit
+        self.selected = selected
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        objects = list(self.queryset[:self.limit])
+        selected = str(self.selected or '')
+        if selected.isdigit() and all(str(obj.pk) != selected for obj in objects):
+            objects += list(self.queryset.filter(pk=selected))
+        for obj in objects:
+            yield self.choice(obj)
+
+
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField that validates against instances loaded in bulk by prefetch_model_choices"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefetched = None
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result.prefetched = None
+        return result
+
+    def prepare_key(self, value):
+        key = self.to_field_name or 'pk'
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, key)
+        model_field = self.queryset.model._meta.pk if key == 'pk' else self.queryset.model._meta.get_field(key)
+        return str(model_field.to_python(value))
+
+    def to_python(self, value):
+        if self.prefetched is None or value in self.empty_values:
+            return super().to_python(value)
+        try:
+            return self.prefetched[self.prepare_key(value)]
+        except (KeyError, ValueError, TypeError, ValidationError):
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+
+
+def prefetch_model_choices(forms_to_validate):
+    """
+    Load the instances submitted to every PrefetchedModelChoiceField before validation.
+
+    Fields are grouped by model and field name, so the same field across many
+    formset forms costs one id IN (...) query instead of one query per form.
+    """
+    groups = {}
+    for form in forms_to_validate:
+        if not form.is_bound:
+            continue
+        for name, field in form.fields.items():
+            if not isinstance(field, PrefetchedModelChoiceField) or field.disabled:
+                continue
+            group = groups.setdefault((field.queryset.model, name), {'fields': [], 'keys': set()})
+            group['fields'].append(field)
+            value = field.widget.value_from_datadict(form.data, form.files, form.add_prefix(name))
+            if value in field.empty_values:
+                continue
+            try:
+                group['keys'].add(field.prepare_key(value))
+            except (ValueError, TypeError, ValidationError):
+                continue
+
+    for group in groups.values():
+        field = group['fields'][0]
+        key = field.to_field_name or 'pk'
+        prefetched = {}
+        if group['keys']:
+            prefetched = {
+                str(getattr(instance, key)): instance
+                for instance in field.queryset.filter(**{f'{key}__in': group['keys']})
+            }
+        for grouped_field in group['fields']:
+            grouped_field.prefetched = prefetched
+
+
+class PrefetchedChoicesFormMixin:
+    """Skip the model-level existence query for foreign keys already resolved by prefetch_model_choices"""
+    _checking_unique = False
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        if not self._checking_unique:
+            exclude.update(
+                name for name, field in self.fields.items()
+                if isinstance(field, PrefetchedModelChoiceField) and field.prefetched is not None
+            )
+        return exclude
+
+    def validate_unique(self):
+        # Unique and unique_together checks must still see every field.
+        self._checking_unique = True
+        try:
+            super().validate_unique()
+        finally:
+            self._checking_unique = False
+
+
 class DivisionSelect(forms.Select):
     def __init__(self, *args, **kwargs):
         self.department_by_division = kwargs.pop('department_by_division', {})
@@ -38,21 +183,6 @@ class SectionSelect(forms.Select):
         return option
 
 
-class EmployeeSelect(forms.Select):
-    def __init__(self, *args, **kwargs):
-        self.employee_org_map = kwargs.pop('employee_org_map', {})
-        super().__init__(*args, **kwargs)
-
-    def create_option(self, name, value, label, selected, index, subindex=None, attrs=None):
-        option = super().create_option(name, value, label, selected, index, subindex=subindex, attrs=attrs)
-        if value in self.employee_org_map:
-            department_id, division_id, section_id = self.employee_org_map[value]
-            option.setdefault('attrs', {})['data-department-id'] = str(department_id or '')
-            option.setdefault('attrs', {})['data-division-id'] = str(division_id or '')
-            option.setdefault('attrs', {})['data-section-id'] = str(section_id or '')
-        return option
-
-
 class RequisitionSelect(forms.Select):
     def __init__(self, *args, **kwargs):
         self.procurement_type_by_requisition = kwargs.pop('procurement_type_by_requisition', {})
@@ -67,25 +197,25 @@ class RequisitionSelect(forms.Select):
         return option
 
 
-class TenderForm(forms.ModelForm):
+class TenderForm(PrefetchedChoicesFormMixin, forms.ModelForm):
     """Form for creating and editing tenders"""
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         employee_queryset = get_employee_ordered_queryset()
-        if 'tender_creator' in self.fields:
-            self.fields['tender_creator'].queryset = employee_queryset
         if 'tender_creator' in self.fields:
             self.fields['tender_creator'].queryset = employee_queryset.filter(
-                section__name__iexact='tenders',
-                section__division__name__iexact='procurement'
+                id__in=get_tender_creator_ids()
             )
         for field_name in ['requisition', 'tender_creator', 'tender_creation_date', 'tender_reference_number']:
             if field_name in self.fields:
                 self.fields[field_name].required = True
         if 'requisition' in self.fields:
             self.fields['requisition'].queryset = Requisition.objects.order_by('-created_at')
-            requisition_map = dict(Requisition.objects.values_list('id', 'procurement_type'))
+            # Only needed to render the options, so a bound form never pays for it on a valid POST.
+            requisition_map = SimpleLazyObject(
+                lambda: dict(Requisition.objects.values_list('id', 'procurement_type'))
+            )
             if isinstance(self.fields['requisition'].widget, RequisitionSelect):
                 self.fields['requisition'].widget.procurement_type_by_requisition = requisition_map
 
@@ -119,6 +249,10 @@ class TenderForm(forms.ModelForm):
             'tender_validity_days', 'tender_validity_expiry_date',
             'tender_evaluation_duration_days', 'tender_evaluation_end_date'
         ]
+        field_classes = {
+            'requisition': PrefetchedModelChoiceField,
+            'tender_creator': PrefetchedModelChoiceField,
+        }
         widgets = {
             'tender_id': forms.NumberInput(attrs={
                 'class': 'form-control',
@@ -232,7 +366,7 @@ class TenderForm(forms.ModelForm):
         }
 
 
-class ContractForm(forms.ModelForm):
+class ContractForm(PrefetchedChoicesFormMixin, forms.ModelForm):
     """Form for creating and editing contracts"""
 
     def __init__(self, *args, **kwargs):
@@ -240,8 +374,7 @@ class ContractForm(forms.ModelForm):
         employee_queryset = get_employee_ordered_queryset()
         if 'contract_creator' in self.fields:
             self.fields['contract_creator'].queryset = employee_queryset.filter(
-                section__name__icontains='contract',
-                section__division__name__iexact='compliance & reporting'
+                id__in=get_contract_creator_ids()
             )
         if 'contract_currency' in self.fields:
             self.fields['contract_currency'].queryset = Currency.objects.order_by('code')
@@ -261,6 +394,12 @@ class ContractForm(forms.ModelForm):
             'performance_security_amount', 'performance_security_duration_days', 'performance_security_expiry_date',
             'e_purchase_order_no', 'sap_purchase_order_no'
         ]
+        field_classes = {
+            'contract_creator': PrefetchedModelChoiceField,
+            'contract_currency': PrefetchedModelChoiceField,
+            'country_of_origin': PrefetchedModelChoiceField,
+            'contract_status': PrefetchedModelChoiceField,
+        }
         widgets = {
             'tender': forms.Select(attrs={
                 'class': 'form-select'
@@ -390,7 +529,7 @@ class ContractForm(forms.ModelForm):
         }
 
 
-class TenderOpeningCommitteeForm(forms.ModelForm):
+class TenderOpeningCommitteeForm(PrefetchedChoicesFormMixin, forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -400,6 +539,9 @@ class TenderOpeningCommitteeForm(forms.ModelForm):
     class Meta:
         model = TenderOpeningCommittee
         fields = ['employee', 'role']
+        field_classes = {
+            'employee': PrefetchedModelChoiceField,
+        }
         widgets = {
             'employee': forms.Select(attrs={
                 'class': 'form-select'
@@ -410,7 +552,7 @@ class TenderOpeningCommitteeForm(forms.ModelForm):
         }
 
 
-class TenderEvaluationCommitteeForm(forms.ModelForm):
+class TenderEvaluationCommitteeForm(PrefetchedChoicesFormMixin, forms.ModelForm):
     """Form for adding evaluation committee members"""
 
     def __init__(self, *args, **kwargs):
@@ -421,6 +563,9 @@ class TenderEvaluationCommitteeForm(forms.ModelForm):
     class Meta:
         model = TenderEvaluationCommittee
         fields = ['employee', 'role']
+        field_classes = {
+            'employee': PrefetchedModelChoiceField,
+        }
         widgets = {
             'employee': forms.Select(attrs={
                 'class': 'form-select'
@@ -431,7 +576,7 @@ class TenderEvaluationCommitteeForm(forms.ModelForm):
         }
 
 
-class ContractCITCommitteeForm(forms.ModelForm):
+class ContractCITCommitteeForm(PrefetchedChoicesFormMixin, forms.ModelForm):
     """Form for adding CIT/Inspection & Acceptance committee members"""
 
     def __init__(self, *args, **kwargs):
@@ -442,6 +587,9 @@ class ContractCITCommitteeForm(forms.ModelForm):
     class Meta:
         model = ContractCITCommittee
         fields = ['employee', 'role']
+        field_classes = {
+            'employee': PrefetchedModelChoiceField,
+        }
         widgets = {
             'employee': forms.Select(attrs={
                 'class': 'form-select'
@@ -492,12 +640,9 @@ class RequisitionForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         employee_queryset = get_employee_ordered_queryset()
-        if 'assigned_user' in self.fields:
-            self.fields['assigned_user'].queryset = employee_queryset
         if 'tender_creator' in self.fields:
             self.fields['tender_creator'].queryset = employee_queryset.filter(
-                section__name__iexact='tenders',
-                section__division__name__iexact='procurement'
+                id__in=get_tender_creator_ids()
             )
 
         department_id = self.data.get('department') if self.data else None
@@ -510,12 +655,15 @@ class RequisitionForm(forms.ModelForm):
             section_id = getattr(self.instance, 'section_id', None)
 
         if 'assigned_user' in self.fields:
-            if section_id:
-                self.fields['assigned_user'].queryset = employee_queryset.filter(section_id=section_id)
-            elif division_id:
-                self.fields['assigned_user'].queryset = employee_queryset.filter(division_id=division_id)
-            elif department_id:
-                self.fields['assigned_user'].queryset = employee_queryset.filter(department_id=department_id)
+            # Any employee of the selected org node, or anyone when none is selected,
+            # may own the requisition. Only the first EMPLOYEE_OPTIONS_LIMIT and the
+            # current owner are rendered; the browser searches the employee_options
+            # endpoint for the rest.
+            field = self.fields['assigned_user']
+            field.queryset = filter_employees_by_org(employee_queryset, department_id, division_id, section_id)
+            field.widget.choices = LimitedModelChoiceIterator(
+                field, get_employee_options_limit(), self['assigned_user'].value()
+            )
 
         if 'division' in self.fields:
             division_map = dict(Division.objects.values_list('id', 'department_id'))
@@ -525,14 +673,6 @@ class RequisitionForm(forms.ModelForm):
             section_map = dict(Section.objects.values_list('id', 'division_id'))
             if isinstance(self.fields['section'].widget, SectionSelect):
                 self.fields['section'].widget.division_by_section = section_map
-        if 'assigned_user' in self.fields and isinstance(self.fields['assigned_user'].widget, EmployeeSelect):
-            employee_map = {
-                emp_id: (dept_id, div_id, sec_id)
-                for emp_id, dept_id, div_id, sec_id in Employee.objects.values_list(
-                    'id', 'department_id', 'division_id', 'section_id'
-                )
-            }
-            self.fields['assigned_user'].widget.employee_org_map = employee_map
 
         for field_name in [
             'e_requisition_no', 'requisition_description', 'shopping_cart_no',
@@ -587,13 +727,13 @@ class RequisitionForm(forms.ModelForm):
             'section': SectionSelect(attrs={
                 'class': 'form-select'
             }),
-            'assigned_user': EmployeeSelect(attrs={
+            'assigned_user': forms.Select(attrs={
                 'class': 'form-select'
             }),
             'procurement_type': forms.Select(attrs={
                 'class': 'form-select'
             }),
-            'tender_creator': EmployeeSelect(attrs={
+            'tender_creator': forms.Select(attrs={
                 'class': 'form-select'
             }),
             'date_assigned': forms.DateInput(attrs={
@@ -0,0 +1,122 @@
+"""
+Background processing for bulk uploads.
+
+Upload views store the file on a BulkUploadJob and return straight away. The
+process_upload_jobs management command claims queued jobs one at a time and
+runs the importer outside the request, recording progress on the job row so
+the upload page can poll it. Those progress updates, and one with every chunk
+committed, double as a heartbeat: a running job whose row has not been touched
+for BULK_UPLOAD_JOB_LEASE seconds belonged to a worker that was stopped, and is
+claimed again and resumed from its checkpoint. On PostgreSQL the process
+running a job also holds an advisory lock on it, so a job whose worker is
+alive but slow is never claimed by a second one.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .bulk_import import BULK_IMPORTS, estimate_row_count
+from .checkpoints import clear_checkpoint, file_sha256, get_checkpoint
+from .locks import advisory_unlock, try_advisory_lock
+from .models import BulkUploadJob
+
+
+def enqueue_upload_job(upload_type, file, user, dry_run=False):
+    """Store an uploaded file as a queued job; run it immediately when background processing is off"""
+    job = BulkUploadJob.objects.create(upload_type=upload_type, file=file, requested_by=user, dry_run=dry_run)
+    if not getattr(settings, 'BULK_UPLOAD_IN_BACKGROUND', True):
+        try_advisory_lock(job_lock_name(job))
+        BulkUploadJob.objects.filter(pk=job.pk).update(status='RUNNING', started_at=timezone.now())
+        job.refresh_from_db()
+        run_upload_job(job)
+    return job
+
+
+def job_lock_name(job):
+    return f'bulk_upload_job:{job.pk}'
+
+
+def claim_next_job():
+    """
+    Mark the oldest queued job, or running job whose worker stopped, as running
+    and return it holding its lock, or None if there is nothing to process
+    """
+    stale = timezone.now() - timedelta(seconds=getattr(settings, 'BULK_UPLOAD_JOB_LEASE', 300))
+    skipped = []
+    with transaction.atomic():
+        while True:
+            job = (
+                BulkUploadJob.objects.select_for_update(skip_locked=True)
+                .filter(Q(status='QUEUED') | Q(status='RUNNING', updated_at__lt=stale))
+                .exclude(pk__in=skipped)
+                .order_by('created_at')
+                .first()
+            )
+            if job is None:
+                return None
+            if try_advisory_lock(job_lock_name(job)):
+                break
+            # Its worker is still running it, only without a heartbeat for a while
+            skipped.append(job.pk)
+        if job.status == 'QUEUED':
+            job.status = 'RUNNING'
+            job.started_at = timezone.now()
+        # Saving renews the lease of a reclaimed job
+        job.save(update_fields=['status', 'started_at', 'updated_at'])
+    return job
+
+
+def track_progress(job, rows):
+    """Pass rows through, saving the number consumed so far to the job at most once per interval"""
+    interval = getattr(settings, 'BULK_UPLOAD_PROGRESS_INTERVAL', 1)
+    last_saved = time.monotonic()
+    for job.rows_processed, row in enumerate(rows, 1):
+        yield row
+        if time.monotonic() - last_saved >= interval:
+            renew_lease(job)
+            last_saved = time.monotonic()
+
+
+def renew_lease(job):
+    """Save the rows consumed so far to the job, renewing its lease"""
+    BulkUploadJob.objects.filter(pk=job.pk).update(rows_processed=job.rows_processed, updated_at=timezone.now())
+
+
+def run_upload_job(job):
+    """Process a claimed job, record its outcome and release its lock"""
+    try:
+        return _run_upload_job(job)
+    finally:
+        advisory_unlock(job_lock_name(job))
+
+
+def _run_upload_job(job):
+    bulk_import = BULK_IMPORTS[job.upload_type]
+    try:
+        with job.file.open('rb') as file:
+            job.total_rows = estimate_row_count(file)
+            BulkUploadJob.objects.filter(pk=job.pk).update(total_rows=job.total_rows)
+            file.seek(0)
+            # An earlier failed upload of the same file resumes from its last committed chunk
+            checkpoint = None
+            if not job.dry_run:
+                checkpoint = get_checkpoint(f'bulk_upload:{job.upload_type}', file_sha256(file))
+            rows = track_progress(job, bulk_import.read(file))
+            job.result_message, job.errors = bulk_import.run(
+                rows, dry_run=job.dry_run, checkpoint=checkpoint, heartbeat=lambda: renew_lease(job),
+            )
+        if checkpoint is not None:
+            clear_checkpoint(checkpoint)
+        job.status = 'COMPLETED'
+    except Exception as e:
+        job.status = 'FAILED'
+        job.result_message = f'Error processing file: {str(e)}'
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'total_rows', 'rows_processed', 'errors', 'result_message', 'finished_at', 'updated_at',
+    ])
+    return job
@@ -0,0 +1,48 @@
+"""
+PostgreSQL session advisory locks.
+
+A session lock is held until it is released or its database connection
+closes, so the lock of a process that is stopped goes with it. Other databases
+have no advisory locks; there every lock is granted, and only one process
+should do the work the lock guards.
+"""
+import hashlib
+from contextlib import contextmanager
+
+from django.db import DatabaseError, connection
+
+
+def lock_key(name):
+    """The signed 64-bit key PostgreSQL advisory locks take, derived from name"""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], 'big', signed=True)
+
+
+def try_advisory_lock(name):
+    """Take the session lock on name without waiting; return whether it was acquired"""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [lock_key(name)])
+        return cursor.fetchone()[0]
+
+
+def advisory_unlock(name):
+    """Release the session lock on name"""
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_key(name)])
+    except DatabaseError:
+        pass  # The lock went with the connection
+
+
+@contextmanager
+def advisory_lock(name):
+    """Hold the session lock on name while the block runs, yielding whether it was acquired"""
+    acquired = try_advisory_lock(name)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            advisory_unlock(name)
@@ -0,0 +1,115 @@
+"""
+Management command to benchmark date and time parsing for imports
+Usage: python manage.py benchmark_date_parsing [--values 200000] [--distinct 500]
+"""
+import random
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from tenders.dates import parse_date, parse_time
+
+DATE_FORMATS = [
+    '%dth %B %Y',  # 9th September 2025
+    '%dst %B %Y',  # 1st September 2025
+    '%dnd %B %Y',  # 2nd September 2025
+    '%drd %B %Y',  # 3rd September 2025
+    '%d %B %Y',    # 25 October 2025
+    '%Y-%m-%d',    # 2025-09-09
+    '%d/%m/%Y',    # 09/09/2025
+]
+TIME_FORMATS = [
+    '%I.%M %p',  # 10.00 a.m
+    '%I:%M %p',  # 10:00 AM
+    '%H:%M',     # 10:00
+]
+
+
+def strptime_date(date_str):
+    """The previous approach: try each strptime format in turn"""
+    if not date_str or date_str.strip() == '':
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def strptime_time(time_str):
+    if not time_str or time_str.strip() == '':
+        return None
+    time_str = time_str.strip().replace('a.m', 'AM').replace('p.m', 'PM')
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(time_str, fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def ordinal(day):
+    if day in (11, 12, 13):
+        return 'th'
+    return {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
+
+
+class Command(BaseCommand):
+    help = 'Compare the strptime loop with tenders.dates on generated export dates and times'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--values', type=int, default=200000, help='Values parsed per run')
+        parser.add_argument('--distinct', type=int, default=500, help='Distinct values they are drawn from')
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        dates, times = self.distinct_values(rng, options['distinct'])
+        date_values = rng.choices(dates, k=options['values'])
+        time_values = rng.choices(times, k=options['values'])
+
+        mismatches = [value for value in dates if parse_date(value) != strptime_date(value)]
+        mismatches += [value for value in times if parse_time(value) != strptime_time(value)]
+        if mismatches:
+            self.stdout.write(self.style.WARNING(f'{len(mismatches)} values parse differently, e.g. {mismatches[:5]}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Both parsers agree on all {len(dates) + len(times):,} distinct values'))
+
+        self.stdout.write(f'{"Parser":<22} {"Values":>9} {"Seconds":>9} {"Values/sec":>12}')
+        for name, parser, values in [
+            ('strptime date', strptime_date, date_values),
+            ('tenders.dates date', parse_date, date_values),
+            ('strptime time', strptime_time, time_values),
+            ('tenders.dates time', parse_time, time_values),
+        ]:
+            if hasattr(parser, 'cache_clear'):
+                parser.cache_clear()
+            start = time.perf_counter()
+            for value in values:
+                parser(value)
+            seconds = time.perf_counter() - start
+            self.stdout.write(f'{name:<22} {len(values):>9,} {seconds:>9.2f} {len(values) / seconds:>12,.0f}')
+
+    def distinct_values(self, rng, count):
+        """Dates and times in the formats the exports use, with a few unreadable ones"""
+        dates, times = set(), set()
+        while len(dates) < count:
+            day, month, year = rng.randint(1, 28), rng.randint(1, 12), rng.randint(2020, 2027)
+            month_name = datetime(year, month, 1).strftime('%B')
+            dates.add(rng.choice([
+                f'{day}{ordinal(day)} {month_name} {year}',
+                f'{day} {month_name} {year}',
+                f'{year}-{month:02d}-{day:02d}',
+                f'{day:02d}/{month:02d}/{year}',
+                f'{day:02d}.{month:02d}.{year}',
+            ]))
+        while len(times) < count:
+            hour, minute = rng.randint(0, 23), rng.randint(0, 59)
+            times.add(rng.choice([
+                f'{hour % 12 or 12}.{minute:02d} {"a.m" if hour < 12 else "p.m"}',
+                f'{hour % 12 or 12}:{minute:02d} {"AM" if hour < 12 else "PM"}',
+                f'{hour:02d}:{minute:02d}',
+                f'{hour}h{minute:02d}',
+            ]))
+        return sorted(dates), sorted(times)
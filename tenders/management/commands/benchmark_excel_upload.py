@@ -0,0 +1,92 @@
+"""
+Management command to benchmark Excel upload parsing
+Usage: python manage.py benchmark_excel_upload [--rows 100000]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook, load_workbook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+COLUMNS = ['employee_id', 'first_name', 'last_name', 'email', 'phone',
+           'department_name', 'division_name', 'section_name', 'job_title', 'is_active']
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def parse_full_workbook(path):
+    """The previous approach: load every cell, then copy the rows into a list"""
+    wb = load_workbook(path)
+    ws = wb.active
+    headers = [str(cell.value).strip() if cell.value else '' for cell in ws[1]]
+    rows = []
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        rows.append({headers[i]: str(value).strip() if value else '' for i, value in enumerate(row)})
+    return len(rows)
+
+
+def parse_streaming(path):
+    from tenders.bulk_import import process_excel_file
+    with open(path, 'rb') as file:
+        return sum(1 for _ in process_excel_file(file, COLUMNS))
+
+
+def run_mode(mode, path, queue):
+    import django
+    django.setup()
+    parser = parse_streaming if mode == 'streaming' else parse_full_workbook
+    start = time.perf_counter()
+    count = parser(path)
+    queue.put((count, time.perf_counter() - start, peak_rss_mb()))
+
+
+class Command(BaseCommand):
+    help = 'Compare peak RSS and throughput of full and read-only Excel parsing on a generated sheet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        fd, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        try:
+            self.stdout.write(f"Generating {options['rows']:,} rows...")
+            self.write_sheet(path, options['rows'])
+
+            self.stdout.write(f'{"Mode":<10} {"Rows":>9} {"Seconds":>9} {"Rows/sec":>10} {"Peak RSS (MB)":>14}')
+            for mode in ['full', 'streaming']:
+                # Each mode runs in its own process so peak RSS is measured independently
+                queue = multiprocessing.Queue()
+                process = multiprocessing.Process(target=run_mode, args=(mode, path, queue))
+                process.start()
+                count, seconds, rss = queue.get()
+                process.join()
+                rss_display = f'{rss:,.1f}' if rss is not None else 'n/a'
+                self.stdout.write(f'{mode:<10} {count:>9,} {seconds:>9.2f} {count / seconds:>10,.0f} {rss_display:>14}')
+        finally:
+            os.remove(path)
+
+    def write_sheet(self, path, rows):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(COLUMNS)
+        for i in range(rows):
+            ws.append([
+                f'EMP{i:06d}', 'Jane', f'Doe{i}', f'jane.doe{i}@kengen.co.ke', '0712345678',
+                'Finance', 'Accounts', 'Payroll', 'Accountant', 'true',
+            ])
+        wb.save(path)
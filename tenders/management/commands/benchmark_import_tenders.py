@@ -0,0 +1,98 @@
+"""
+Management command to benchmark the parsing stage of import_tenders across worker counts
+Usage: python manage.py benchmark_import_tenders [--rows 200000] [--batch-size 500] [--workers 1 2 4]
+"""
+import csv
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tenders.bulk_import import iter_batches
+from tenders.management.commands.import_tenders import iter_parsed_chunks
+
+COLUMNS = [
+    'Tender ID', 'Region', 'Department ', 'Section', 'Tender Creator', 'Contract Creator', 'User',
+    'Tender Description', 'Tender Creation Date', 'Tender Advert Date', 'Tender Closing Date',
+    'Tender Closing Time', 'Procurement Type', 'Shopping Cart', 'Shopping Cart Amount',
+    'Requisition Number', 'Eligibility', 'Tender Validity(days)', 'Tender Evaluation Duration(30/21 Days)',
+    'Contract number', 'Contract title', 'Contract Value', 'Contract Currency', 'Country of Origin',
+    'Commencement date', 'Contract duration', 'Contract duration measure', 'e-Contract Status',
+    'LOA (Letter of Award status)', 'Responsibility', 'Contract Step',
+]
+
+
+def default_worker_counts():
+    """1, 2, 4, ... up to the number of CPUs, always ending with the CPU count"""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cpus:
+        counts.append(counts[-1] * 2)
+    if cpus > 1:
+        counts.append(cpus)
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Time parsing a generated Procurement Tracking CSV with import_tenders worker pools of different sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'BULK_UPLOAD_BATCH_SIZE', 500))
+        parser.add_argument('--workers', type=int, nargs='+', help='Worker counts to time (default: 1, 2, 4, ... CPUs)')
+
+    def handle(self, *args, **options):
+        worker_counts = options['workers'] or default_worker_counts()
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        try:
+            self.stdout.write(f"Generating {options['rows']:,} rows...")
+            self.write_csv(path, options['rows'])
+
+            self.stdout.write(f'{os.cpu_count()} CPUs available')
+            self.stdout.write(f'{"Workers":>7} {"Rows":>9} {"Seconds":>9} {"Rows/sec":>10} {"Speedup":>8}')
+            baseline = None
+            for workers in worker_counts:
+                count, seconds = self.parse(path, options['batch_size'], workers)
+                baseline = baseline or seconds
+                self.stdout.write(
+                    f'{workers:>7} {count:>9,} {seconds:>9.2f} {count / seconds:>10,.0f} {baseline / seconds:>7.2f}x'
+                )
+        finally:
+            os.remove(path)
+
+    def parse(self, path, batch_size, workers):
+        """Read and parse the file as import_tenders does, without writing; return (rows, seconds)"""
+        start = time.perf_counter()
+        count = 0
+        with open(path, 'r', encoding='utf-8') as file:
+            rows = enumerate(csv.DictReader(file), 2)
+            for _, parsed, _ in iter_parsed_chunks(iter_batches(rows, batch_size), workers):
+                count += len(parsed)
+        return count, time.perf_counter() - start
+
+    def write_csv(self, path, rows):
+        regions = ['Central', 'Western', 'Eastern']
+        departments = ['ICT', 'Finance', 'Supply Chain']
+        sections = ['Payroll', 'Tenders', 'Networks']
+        people = ['John Smith', 'Mary Wanjiku', 'Peter Otieno', 'Grace Achieng']
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            for i in range(rows):
+                has_contract = i % 3 == 0
+                writer.writerow([
+                    f'Tender ID : {i + 1}', regions[i % 3], departments[i % 3], sections[i % 3],
+                    people[i % 4], people[(i + 1) % 4] if has_contract else '', people[(i + 2) % 4],
+                    f'Supply of equipment lot {i}', f'{i % 28 + 1:02d}/09/2025', f'{i % 28 + 1}th September 2025',
+                    f'2025-10-{i % 28 + 1:02d}', '10.00 a.m' if i % 2 else '14:30',
+                    'Request for Quotation' if i % 5 == 0 else 'Open Tender', i, f'{i * 10 + 1000}.50',
+                    f'REQ{i:07d}', 'AGPO' if i % 7 == 0 else 'OPEN', 90, 21,
+                    i if has_contract else '', f'Contract {i}' if has_contract else '',
+                    f'{i * 100 + 5000}' if has_contract else '', 'KES' if has_contract else '',
+                    'Kenya' if has_contract else '', f'2025-11-{i % 28 + 1:02d}' if has_contract else '',
+                    12 if has_contract else '', 'Months' if has_contract else '',
+                    'Active' if has_contract else '', 'Issued', 'x', 'Draft' if has_contract else '',
+                ])
@@ -0,0 +1,84 @@
+"""
+Management command to benchmark tender list row rendering
+Usage: python manage.py benchmark_tender_list [--sizes 1000 10000 50000]
+"""
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tenders.models import Department, Employee, Region, Requisition, Section, Tender
+from tenders.renderers import get_tender_row_cache, render_tender_row, render_tender_rows, tender_row_cache_key
+from tenders.streaming import get_stream_chunk_size
+
+
+class Command(BaseCommand):
+    help = 'Benchmark tender list row rendering with and without the configured row cache (no database writes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 50000])
+
+    def handle(self, *args, **options):
+        chunk_size = get_stream_chunk_size()
+        # The cache the tender list uses, so warm numbers include any culling its MAX_ENTRIES causes
+        cache = get_tender_row_cache()
+        # Only backends that cull, such as the per-process LocMemCache, are bound by MAX_ENTRIES
+        max_entries = cache._max_entries if hasattr(cache, '_cull') else None
+        self.stdout.write(f'Row cache: {type(cache).__name__}, MAX_ENTRIES {max_entries or "not applied"}')
+        self.stdout.write(
+            f'{"Tenders":>8} {"Uncached (s)":>13} {"Cold cache (s)":>15} {"Warm cache (s)":>15} '
+            f'{"Warm rows/s":>12} {"Rows MB":>8}'
+        )
+
+        for size in options['sizes']:
+            if max_entries and size > max_entries:
+                self.stdout.write(self.style.WARNING(
+                    f'{size} tenders do not fit in {max_entries} cache entries; '
+                    f'set TENDER_ROW_CACHE_REDIS_URL or raise TENDER_ROW_CACHE_MAX_ENTRIES'
+                ))
+            tenders = self.build_tenders(size)
+            chunks = [tenders[i:i + chunk_size] for i in range(0, size, chunk_size)]
+
+            uncached = self.time_it(lambda: [render_tender_row(tender) for tender in tenders])
+            cold = self.time_it(lambda: [render_tender_rows(chunk) for chunk in chunks])
+            warm = self.time_it(lambda: [render_tender_rows(chunk) for chunk in chunks])
+            megabytes = sum(len(str(render_tender_row(tender))) for tender in tenders) / (1024 * 1024)
+
+            self.stdout.write(
+                f'{size:>8} {uncached:>13.3f} {cold:>15.3f} {warm:>15.3f} {size / warm:>12,.0f} {megabytes:>8.1f}'
+            )
+            # Remove only the benchmark's rows, in case the cache is shared
+            cache.delete_many([tender_row_cache_key(tender) for tender in tenders])
+
+    def time_it(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def build_tenders(self, size):
+        """Build unsaved tenders with their related rows attached, as select_related would"""
+        now = timezone.now()
+        region = Region(id=1, name='Western Region', updated_at=now)
+        department = Department(id=1, name='Supply Chain', updated_at=now)
+        section = Section(id=1, name='Tenders', updated_at=now)
+        creator = Employee(id=1, first_name='Jane', last_name='Doe', employee_id='71188', updated_at=now)
+        methods = [value for value, _ in Tender.PROCUREMENT_METHOD_CHOICES]
+        steps = [value for value, _ in Tender.TENDER_STEP_CHOICES]
+
+        tenders = []
+        for i in range(1, size + 1):
+            requisition = Requisition(
+                id=i, e_requisition_no=f'REQ-{i}', shopping_cart_amount=Decimal('1234567.89') + i,
+                region=region, department=department, section=section, updated_at=now,
+            )
+            tenders.append(Tender(
+                id=i, tender_id=i, tender_reference_number=f'KENGEN/197/{i:04d}/2025-26',
+                tender_description='Supply, delivery, installation and commissioning of equipment ' * 3,
+                procurement_method=methods[i % len(methods)], tender_step=steps[i % len(steps)],
+                tender_advert_date=date(2025, 9, 1) + timedelta(days=i % 90),
+                tender_closing_date=date(2025, 10, 1) + timedelta(days=i % 90),
+                requisition=requisition, tender_creator=creator, updated_at=now,
+            ))
+        return tenders
@@ -0,0 +1,67 @@
+"""
+Management command to run a bulk upload from a file on the server, for initial
+loads and HR refreshes too large to send through the upload pages
+Usage: python manage.py bulk_import employee staff.xlsx [--dry-run] [--restart]
+"""
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from tenders.bulk_import import BULK_IMPORTS
+from tenders.checkpoints import clear_checkpoint, file_sha256, get_checkpoint
+
+
+class Command(BaseCommand):
+    help = 'Import a CSV or Excel file with the bulk upload of the given type and report rows/sec'
+
+    def add_arguments(self, parser):
+        parser.add_argument('upload_type', choices=sorted(BULK_IMPORTS), help='Bulk upload to run the file through')
+        parser.add_argument('path', help='CSV or Excel file to import')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without writing anything')
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore the checkpoint of an interrupted run and import the whole file again'
+        )
+
+    def handle(self, *args, **options):
+        bulk_import = BULK_IMPORTS[options['upload_type']]
+        method = 'COPY' if bulk_import.copy_enabled() else 'ORM'
+        self.stdout.write(f"Importing {options['path']} as {options['upload_type']} ({method}, {bulk_import.batch_size()} rows per chunk)")
+
+        try:
+            file = open(options['path'], 'rb')
+        except OSError as e:
+            raise CommandError(f'Cannot open {options["path"]}: {e}')
+
+        read = 0
+
+        def count_rows(rows):
+            nonlocal read
+            for read, row in enumerate(rows, 1):
+                yield row
+
+        with file:
+            upload = File(file, name=options['path'])
+            # Shares the upload pages' checkpoints, so a failed load resumes whichever way it is re-run
+            checkpoint = None
+            if not options['dry_run']:
+                checkpoint = get_checkpoint(
+                    f"bulk_upload:{options['upload_type']}", file_sha256(upload), restart=options['restart']
+                )
+            started = time.perf_counter()
+            try:
+                rows = count_rows(bulk_import.read(upload))
+                message, errors = bulk_import.run(rows, dry_run=options['dry_run'], checkpoint=checkpoint)
+            except ValueError as e:
+                raise CommandError(str(e))
+            elapsed = time.perf_counter() - started
+
+        if checkpoint is not None:
+            clear_checkpoint(checkpoint)
+        for error in errors[:20]:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}, {error['column']}: {error['error']}"))
+        if len(errors) > 20:
+            self.stdout.write(self.style.WARNING(f'... and {len(errors) - 20} more errors'))
+        self.stdout.write(self.style.SUCCESS(message))
+        self.stdout.write(f'Read {read} rows in {elapsed:.1f}s ({read / elapsed if elapsed else 0:,.0f} rows/sec)')
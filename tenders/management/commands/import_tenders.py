@@ -1,395 +1,622 @@
 """
-Management command to import tender data from CSV file
-Usage: python manage.py import_tenders
+Management command to import tender data from the Procurement Tracking export, as CSV
+(optionally gzip or bzip2 compressed) or XLSX, from files, directories or standard input
+Usage: python manage.py import_tenders [export.csv.gz | exports/ | 'exports/*.csv' | -] [--batch-size 500]
+                                      [--workers 4] [--restart] [--full] [--plan [import-plan.txt]]
+                                      [--profile] [--profile-output import.prof]
 """
-import csv
-from datetime import datetime
-from django.core.management.base import BaseCommand
+import cProfile
+import glob
+import hashlib
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
+from django.db import transaction
+from tenders.bulk_import import iter_batches
+from tenders.checkpoints import clear_checkpoint, file_sha256, get_checkpoint, save_checkpoint
 from tenders.models import (
     Region, Department, Division, Section,
     LOAStatus, ContractStatus, Employee, Tender, Requisition,
     Currency, Country, Contract
 )
+from tenders.profiling import ImportProfiler
+from tenders.provisioning import provision_people, split_name, username_for
+from tenders.roles import bump_role_version_on_commit
+from tenders.tender_csv import SOURCE_SUFFIXES, parse_file, parse_rows, read_rows
+
+# Seconds between progress lines with --profile
+PROGRESS_INTERVAL = 5
+
+# Fields left out of --plan diffs: the key and bookkeeping
+PLAN_SKIPPED_FIELDS = {'id', 'tender', 'created_at', 'updated_at', 'source_row_hash'}
+
+
+def expand_paths(paths):
+    """Expand directories and glob patterns into export files, each in name order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(SOURCE_SUFFIXES) and os.path.isfile(os.path.join(path, name))
+            )
+        elif any(char in path for char in '*?['):
+            matches = sorted(glob.glob(path))
+            if not matches:
+                raise CommandError(f'No files match {path}')
+            files += matches
+        else:
+            files.append(path)
+    if not files:
+        raise CommandError(f'No exports found in {", ".join(paths)}')
+    return list(dict.fromkeys(files))
+
+
+def merge_files(files):
+    """
+    Merge the ParsedRows of several files into one list, in file order.
+
+    Precedence rule: a tender found in several files keeps only its rows from
+    the last file that has it, so pass the files oldest first. Within that file
+    all of its rows are kept in order, as a single-file import would apply them.
+    """
+    owner = {}
+    for index, parsed in enumerate(files):
+        for row in parsed:
+            owner[row.tender_id] = index
+    return [row for index, parsed in enumerate(files) for row in parsed if owner[row.tender_id] == index]
+
+
+def select_by(model, field, **filters):
+    """A select for Command.extend: the (field, id) pairs of the model's records with the given keys"""
+    return lambda keys: model.objects.filter(**{f'{field}__in': keys}, **filters).values_list(field, 'id')
+
+
+def plan_value(value):
+    """Show a field value in an import plan, shortening long text"""
+    if value is None:
+        return '-'
+    if isinstance(value, str):
+        return repr(value if len(value) <= 60 else value[:57] + '...')
+    return str(value)
+
+
+def iter_parsed_chunks(chunks, workers):
+    """
+    Parse chunks of (row_number, row) pairs, yielding (last row number, ParsedRows, warnings) in file order.
+
+    With more than one worker the chunks are parsed in a process pool, a few chunks
+    ahead of the caller, so parsing overlaps with the writes in this process.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield (chunk[-1][0], *parse_rows([row for _, row in chunk]))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk[-1][0], pool.submit(parse_rows, [row for _, row in chunk])))
+            # Bound the chunks held in memory to a couple per worker
+            if len(pending) >= workers * 2:
+                last_row, future = pending.popleft()
+                yield (last_row, *future.result())
+        while pending:
+            last_row, future = pending.popleft()
+            yield (last_row, *future.result())
 
 
 class Command(BaseCommand):
     help = 'Import tender data from CSV file'
 
-    def handle(self, *args, **options):
-        csv_file = 'Procurement Tracking.csv'
-        
-        self.stdout.write(self.style.SUCCESS(f'Starting import from {csv_file}'))
-        
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            for row in reader:
-                self.stdout.write(f"Processing Tender ID: {row.get('Tender ID', 'N/A')}")
-                
-                # Get or create lookup data
-                region = self.get_or_create_region(row.get('Region'))
-                department = self.get_or_create_department(row.get('Department '))  # Note the space in CSV
-                section = self.get_or_create_section(row.get('Section'), department)
-                division = section.division if section else None
-                loa_status = self.get_or_create_loa_status(row.get('LOA (Letter of Award status)'))
-                contract_status = self.get_or_create_contract_status(row.get('e-Contract Status'))
-                
-                # Get or create employees
-                tender_creator = self.get_or_create_employee(row.get('Tender Creator'), department)
-                contract_creator = self.get_or_create_employee(row.get('Contract Creator'), department)
-                user = self.get_or_create_employee(row.get('User'), department)
-                
-                # Parse dates
-                tender_creation_date = self.parse_date(row.get('Tender Creation Date'))
-                proposed_advert_date = self.parse_date(row.get('Proposed Advert Date'))
-                tender_advert_date = self.parse_date(row.get('Tender Advert Date'))
-                tender_closing_date = self.parse_date(row.get('Tender Closing Date'))
-                tender_validity_expiry_date = self.parse_date(row.get('Tender Validity Expiry Date'))
-                
-                # Parse time
-                tender_closing_time = self.parse_time(row.get('Tender Closing Time'))
-                
-                # Extract tender ID from the "Tender ID : 38" format
-                tender_id_raw = row.get('Tender ID', '')
-                tender_id_clean = tender_id_raw.split(':')[-1].strip() if ':' in tender_id_raw else tender_id_raw
-                tender_id = self.parse_int(tender_id_clean) or 0
-
-                tender_reference_number = row.get('Tender Reference Number') or row.get('eGP Tender Reference') or row.get('KenGen Tender Reference') or ''
-                eligibility = (row.get('Eligibility') or 'OPEN').strip().upper()
-                agpo_category = (row.get('AGPO') or '').strip().upper() or None
-                tender_approval_status = (row.get('Tender Approval status') or '').strip().upper().replace(' ', '_') or None
-                tender_step = (row.get('Tender Step') or '').strip().upper().replace(' ', '_') or None
-                tender_validity_days = self.parse_int(row.get('Tender Validity(days)'))
-                procurement_method = self.map_procurement_method(row.get('Procurement Method') or row.get('Procurement Type'))
-                
-                requisition_number = row.get('Requisition Number') or None
-                if not requisition_number:
-                    requisition_number = f"REQ-{tender_id}"
-
-                shopping_cart_no = self.parse_int(row.get('Shopping Cart'))
-                shopping_cart_amount = self.parse_decimal(row.get('Shopping Cart Amount')) or 0
-                shopping_cart_status_raw = (row.get('Shopping cart status') or '').strip().upper()
-                shopping_cart_status = shopping_cart_status_raw.replace(' ', '_') or 'PENDING'
-                requisition_description = row.get('Requisition Description') or row.get('Tender Description') or ''
-                date_assigned = self.parse_date(row.get('Date Assigned')) or tender_advert_date or datetime.today().date()
-
-                procurement_type_raw = (row.get('Procurement Type') or '').strip().upper()
-                procurement_type = 'QUOTATION' if 'QUOTATION' in procurement_type_raw else 'TENDER'
-
-                requisition, _ = Requisition.objects.update_or_create(
-                    e_requisition_no=requisition_number,
-                    defaults={
-                        'requisition_description': requisition_description,
-                        'shopping_cart_no': shopping_cart_no or 0,
-                        'shopping_cart_amount': shopping_cart_amount,
-                        'shopping_cart_status': shopping_cart_status,
-                        'region': region,
-                        'department': department,
-                        'division': division,
-                        'section': section,
-                        'assigned_user': user,
-                        'procurement_type': procurement_type,
-                        'tender_creator': tender_creator,
-                        'date_assigned': date_assigned,
-                    }
-                )
-
-                # Create or update tender
-                tender, created = Tender.objects.update_or_create(
-                    tender_id=tender_id,
-                    defaults={
-                        'requisition': requisition,
-                        'tender_reference_number': tender_reference_number,
-                        'tender_creation_date': tender_creation_date or tender_advert_date or datetime.today().date(),
-                        'tender_description': row.get('Tender Description') or '',
-                        'eligibility': 'AGPO' if eligibility == 'AGPO' else 'OPEN',
-                        'agpo_category': agpo_category if eligibility == 'AGPO' else None,
-                        'procurement_method': procurement_method,
-                        'tender_creator': tender_creator,
-                        'created_by': tender_creator,
-                        'proposed_advert_date': proposed_advert_date,
-                        'tender_advert_date': tender_advert_date,
-                        'tender_closing_date': tender_closing_date,
-                        'tender_closing_time': tender_closing_time,
-                        'tender_validity_days': tender_validity_days,
-                        'tender_validity_expiry_date': tender_validity_expiry_date,
-                        'tender_evaluation_duration_days': self.parse_int(row.get('Tender Evaluation Duration(30/21 Days)')),
-                        'tender_approval_status': tender_approval_status,
-                        'tender_step': tender_step,
-                    }
-                )
-
-                contract_number = self.parse_int(row.get('Contract number'))
-                contract_title = row.get('Contract title') or None
-                contract_duration_measure = self.map_duration_measure(row.get('Contract duration measure'))
-                contract_duration = self.parse_int(row.get('Contract duration'))
-                commencement_date = self.parse_date(row.get('Commencement date'))
-                contract_value = self.parse_decimal(row.get('Contract Value'))
-                contract_currency = self.get_or_create_currency(row.get('Contract Currency'))
-                contractor_supplier = row.get('Contractor/Supplier') or None
-                country_of_origin = self.get_or_create_country(row.get('Country of Origin'))
-                tender_security_amount = self.parse_decimal(row.get('Tender Security Amount'))
-                tender_security_validity_days = self.parse_int(row.get('Tender Security validity (days)'))
-                contract_step = self.map_contract_step(row.get('Contract Step'))
-                responsibility = self.map_responsibility(row.get('Responsibility'))
-                contract_delivery_period = self.parse_int(row.get('Contract Delivery Period'))
-                performance_security_amount = self.parse_decimal(row.get('Performance Security Amount'))
-                performance_security_duration_days = self.parse_int(row.get('Performance Security Duration (Days)'))
-                e_purchase_order_no = row.get('eGP Purchase order No') or None
-                sap_purchase_order_no = row.get('SAP Purchase Order No') or None
-
-                if contract_number or contract_title or contract_value or contractor_supplier:
-                    Contract.objects.update_or_create(
-                        tender=tender,
-                        defaults={
-                            'contract_number': contract_number,
-                            'contract_title': contract_title,
-                            'contract_creator': contract_creator,
-                            'contract_duration_measure': contract_duration_measure,
-                            'contract_duration': contract_duration,
-                            'commencement_date': commencement_date,
-                            'contract_value': contract_value,
-                            'contract_currency': contract_currency,
-                            'contractor_supplier': contractor_supplier,
-                            'country_of_origin': country_of_origin,
-                            'tender_security_amount': tender_security_amount,
-                            'tender_security_validity_days': tender_security_validity_days,
-                            'contract_step': contract_step,
-                            'contract_status': contract_status,
-                            'responsibility': responsibility,
-                            'contract_delivery_period': contract_delivery_period,
-                            'performance_security_amount': performance_security_amount,
-                            'performance_security_duration_days': performance_security_duration_days,
-                            'e_purchase_order_no': e_purchase_order_no,
-                            'sap_purchase_order_no': sap_purchase_order_no,
-                        }
-                    )
-                
-                action = 'Created' if created else 'Updated'
-                self.stdout.write(self.style.SUCCESS(f'{action} tender: {tender.tender_id}'))
-        
-        self.stdout.write(self.style.SUCCESS('Import completed successfully!'))
-    
-    def get_or_create_region(self, name):
-        if not name or name.strip() == '':
-            return None
-        region, _ = Region.objects.get_or_create(name=name.strip())
-        return region
-    
-    def get_or_create_department(self, name):
-        if not name or name.strip() == '':
-            return None
-        department, _ = Department.objects.get_or_create(name=name.strip())
-        return department
-    
-    def get_or_create_section(self, name, department):
-        if not name or name.strip() == '' or not department:
-            return None
-        # For simplicity, create a default division if needed
-        division, _ = Division.objects.get_or_create(
-            name='General',
-            department=department
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['Procurement Tracking.csv'], metavar='path',
+            help='CSV, .csv.gz, .csv.bz2 or .xlsx exports, directories or glob patterns to import, '
+                 'or - for standard input. A tender in several files is taken from the last of them.'
         )
-        section, _ = Section.objects.get_or_create(
-            name=name.strip(),
-            division=division
+        parser.add_argument(
+            '--batch-size', type=int, default=getattr(settings, 'BULK_UPLOAD_BATCH_SIZE', 500),
+            help='Rows committed per transaction'
         )
-        return section
-    
-    def get_or_create_loa_status(self, name):
-        if not name or name.strip() == '':
-            return None
-        loa_status, _ = LOAStatus.objects.get_or_create(name=name.strip())
-        return loa_status
-    
-    def get_or_create_contract_status(self, name):
-        if not name or name.strip() == '':
-            return None
-        contract_status, _ = ContractStatus.objects.get_or_create(name=name.strip())
-        return contract_status
-    
-    def get_or_create_employee(self, name, department):
-        if not name or name.strip() == '':
-            return None
-        
-        # Split name into first and last
-        name_parts = name.strip().split()
-        first_name = name_parts[0] if len(name_parts) > 0 else 'Unknown'
-        last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else ''
-        
-        # Create a username from the name
-        username = name.strip().replace(' ', '_').lower()
-        employee_id = username
-        
-        # Get or create user
-        user, _ = User.objects.get_or_create(
-            username=username,
-            defaults={
-                'first_name': first_name,
-                'last_name': last_name,
-            }
+        parser.add_argument(
+            '--workers', type=int,
+            help='Processes parsing rows in parallel; this process does all the database writes '
+                 '(default: 1 for one file, one per file up to the CPU count for several)'
         )
-        
-        # Get or create employee
-        employee, _ = Employee.objects.get_or_create(
-            user=user,
-            defaults={
-                'employee_id': employee_id,
-                'first_name': first_name,
-                'last_name': last_name,
-                'email': f'{username}@kengen.co.ke',
-                'department': department,
-            }
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore the checkpoint of an interrupted run and import the whole file again'
         )
-        
-        return employee
-    
-    def parse_date(self, date_str):
-        """Parse various date formats"""
-        if not date_str or date_str.strip() == '':
-            return None
-        
-        # Try different date formats
-        formats = [
-            '%dth %B %Y',  # 9th September 2025
-            '%dst %B %Y',  # 1st September 2025
-            '%dnd %B %Y',  # 2nd September 2025
-            '%drd %B %Y',  # 3rd September 2025
-            '%d %B %Y',    # 25 October 2025
-            '%Y-%m-%d',    # 2025-09-09
-            '%d/%m/%Y',    # 09/09/2025
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str.strip(), fmt).date()
-            except ValueError:
-                continue
-        
-        self.stdout.write(self.style.WARNING(f'Could not parse date: {date_str}'))
-        return None
-    
-    def parse_time(self, time_str):
-        """Parse time format"""
-        if not time_str or time_str.strip() == '':
-            return None
-        
-        # Try different time formats
-        formats = [
-            '%I.%M %p',  # 10.00 a.m
-            '%I:%M %p',  # 10:00 AM
-            '%H:%M',     # 10:00
-        ]
-        
-        time_str = time_str.strip().replace('a.m', 'AM').replace('p.m', 'PM')
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(time_str, fmt).time()
-            except ValueError:
-                continue
-        
-        self.stdout.write(self.style.WARNING(f'Could not parse time: {time_str}'))
-        return None
-    
-    def parse_decimal(self, value_str):
-        """Parse decimal values"""
-        if not value_str or value_str.strip() == '':
-            return None
-        
-        try:
-            # Remove commas and convert to decimal
-            clean_value = value_str.strip().replace(',', '')
-            return float(clean_value)
-        except ValueError:
-            self.stdout.write(self.style.WARNING(f'Could not parse decimal: {value_str}'))
-            return None
-
-    def map_procurement_method(self, raw_value):
-        if not raw_value:
-            return None
-        value = str(raw_value).strip().upper()
-        if 'QUOTATION' in value:
-            return 'REQUEST_FOR_QUOTATION'
-        if 'DIRECT' in value:
-            return 'DIRECT_PROCUREMENT'
-        if 'RESTRICTED' in value:
-            return 'RESTRICTED_TENDER'
-        if 'OPEN' in value:
-            return 'OPEN_TENDER'
-        if 'PROPOSAL' in value:
-            return 'REQUEST_FOR_PROPOSAL'
-        if 'EXPRESSION' in value:
-            return 'EXPRESSION_OF_INTEREST'
-        if 'PREQUAL' in value:
-            return 'PREQUALIFICATION'
-        if 'FRAMEWORK' in value:
-            return 'FRAMEWORK'
-        return None
-
-    def parse_int(self, value_str):
-        """Parse integer values"""
-        if not value_str or value_str.strip() == '':
-            return None
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Write every row, including rows unchanged since they were last imported'
+        )
+        parser.add_argument(
+            '--plan', nargs='?', const='import-plan.txt', metavar='FILE',
+            help='Write the records and fields the import would create or change to FILE '
+                 '(default import-plan.txt) instead of importing'
+        )
+        parser.add_argument(
+            '--profile', action='store_true',
+            help='Report time, queries and peak memory per phase, with progress lines instead of per-row output. '
+                 'Memory tracing makes the import itself slower.'
+        )
+        parser.add_argument(
+            '--profile-output', metavar='FILE',
+            help='Write cProfile stats of this process (not of --workers processes) to FILE'
+        )
+
+    def handle(self, *args, **options):
+        self.profiler = ImportProfiler()
+        self.profiling = options['profile']
+        self.verbosity = options['verbosity']
+        self.plan_path = options['plan']
+        stats = cProfile.Profile() if options['profile_output'] else None
+
+        paths = expand_paths(options['paths'])
+        if '-' in paths and len(paths) > 1:
+            raise CommandError('Standard input cannot be imported together with files')
+
+        with ExitStack() as stack:
+            if self.profiling:
+                stack.enter_context(self.profiler.tracing())
+            if stats:
+                stack.enter_context(stats)
+            if len(paths) == 1:
+                self.import_file(paths[0], options)
+            else:
+                self.import_files(paths, options)
 
+        if stats:
+            stats.dump_stats(options['profile_output'])
+            self.stdout.write(f"cProfile stats written to {options['profile_output']}")
+        if self.profiling:
+            for line in self.profiler.report():
+                self.stdout.write(line)
+
+    def import_file(self, path, options):
+        """Stream one export through the parsers and the writer a chunk at a time"""
+        self.stdout.write(self.style.SUCCESS(f'Starting import from {"standard input" if path == "-" else path}'))
         try:
-            clean_value = value_str.strip().replace(',', '')
-            return int(float(clean_value))
-        except ValueError:
-            self.stdout.write(self.style.WARNING(f'Could not parse int: {value_str}'))
-            return None
-
-    def map_duration_measure(self, raw_value):
-        if not raw_value:
-            return None
-        value = str(raw_value).strip().upper()
-        if 'DAY' in value:
-            return 'DAYS'
-        if 'MONTH' in value:
-            return 'MONTHS'
-        if 'YEAR' in value:
-            return 'YEARS'
-        return None
-
-    def map_contract_step(self, raw_value):
-        if not raw_value:
-            return None
-        value = str(raw_value).strip().upper().replace(' ', '_')
-        mapping = {
-            'DRAFT': 'DRAFT',
-            'ACTIVE': 'ACTIVE',
-            'AWARDED': 'AWARDED',
-            'SIGNED': 'SIGNED',
-            'CLOSED': 'CLOSED',
+            file = nullcontext(sys.stdin.buffer) if path == '-' else open(path, 'rb')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+
+        with file as file:
+            # A plan writes nothing, so needs no checkpoint; a pipe cannot be hashed and read again
+            file_hash = None
+            if self.plan_path:
+                pass
+            elif file.seekable():
+                with self.profiler.phase('setup'):
+                    file_hash = file_sha256(file)
+            else:
+                self.stdout.write(self.style.WARNING(
+                    'Reading from a pipe without a checkpoint: an interrupted import starts over, skipping the rows it already imported.'
+                ))
+            checkpoint, last_row = self.start(file_hash, options)
+
+            # Numbered as a spreadsheet shows them, with the header as row 1
+            rows = ((row_number, row) for row_number, row in enumerate(read_rows(file), 2) if row_number > last_row)
+            # With --workers, parse time is the time spent waiting on the pool
+            chunks = self.profiler.timed('read', iter_batches(rows, options['batch_size']))
+            parsed_chunks = self.profiler.timed('parse', iter_parsed_chunks(chunks, options['workers'] or 1))
+            self.write_chunks(parsed_chunks, checkpoint)
+
+    def import_files(self, paths, options):
+        """Parse several exports at once and write their merged rows as one import"""
+        self.stdout.write(self.style.SUCCESS(f'Starting import from {len(paths)} files'))
+        with self.profiler.phase('setup'):
+            digest = hashlib.sha256()
+            for path in paths:
+                try:
+                    with open(path, 'rb') as file:
+                        digest.update(file_sha256(file).encode())
+                except OSError as e:
+                    raise CommandError(f'Cannot open {path}: {e}')
+        checkpoint, last_row = self.start(None if self.plan_path else digest.hexdigest(), options)
+
+        workers = options['workers'] or min(len(paths), os.cpu_count() or 1)
+        with self.profiler.phase('parse'):
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(parse_file, paths))
+            else:
+                results = [parse_file(path) for path in paths]
+
+        files = []
+        for path, (parsed, warnings) in zip(paths, results):
+            for warning in warnings:
+                self.stdout.write(self.style.WARNING(f'{path}: {warning}'))
+            files.append(parsed)
+        merged = merge_files(files)
+        superseded = sum(map(len, files)) - len(merged)
+        if superseded:
+            self.stdout.write(f'{superseded} rows skipped for tenders also in a later file')
+
+        # Rows are numbered by their position in the merged batch
+        rows = ((row_number, row) for row_number, row in enumerate(merged, 1) if row_number > last_row)
+        chunks = ((chunk[-1][0], [row for _, row in chunk], []) for chunk in iter_batches(rows, options['batch_size']))
+        self.write_chunks(chunks, checkpoint)
+
+    def start(self, file_hash, options):
+        """Load the checkpoint for file_hash, if any, and the lookups; return the checkpoint and the row to resume after"""
+        self.started = time.perf_counter()
+        with self.profiler.phase('setup'):
+            # Rows are committed in chunks; a re-run after a failure resumes after the last one
+            checkpoint = None
+            if file_hash:
+                checkpoint = get_checkpoint('import_tenders', file_hash, restart=options['restart'])
+            self.counters = Counter({'created': 0, 'updated': 0, 'unchanged': 0})
+            last_row = checkpoint.last_row if checkpoint else 0
+            if last_row:
+                self.counters.update(checkpoint.counters)
+                self.stdout.write(self.style.WARNING(
+                    f'Resuming after row {checkpoint.last_row} '
+                    f'({self.counters["created"]} created and {self.counters["updated"]} updated so far)'
+                ))
+
+            self.preload_lookups()
+            # Fingerprints of the rows last imported, by Tender ID
+            self.fingerprints = {} if options['full'] else dict(
+                Tender.objects.exclude(source_row_hash='').values_list('tender_id', 'source_row_hash')
+            )
+            self.written_requisitions = set()
+            self.planned_records = []
+        return checkpoint, last_row
+
+    def write_chunks(self, parsed_chunks, checkpoint):
+        """Import (last row number, ParsedRows, warnings) chunks, committing each with the checkpoint"""
+        if self.plan_path:
+            self.plan_chunks(parsed_chunks)
+            return
+        counters = self.counters
+        processed = 0
+        last_progress = time.perf_counter()
+        for last_row, parsed, warnings in parsed_chunks:
+            for warning in warnings:
+                self.stdout.write(self.style.WARNING(warning))
+            with self.profiler.phase('commit'), transaction.atomic():
+                created, updated, unchanged = self.import_chunk(parsed)
+                counters['created'] += created
+                counters['updated'] += updated
+                counters['unchanged'] += unchanged
+                if checkpoint:
+                    save_checkpoint(checkpoint, last_row, counters)
+            processed += len(parsed)
+
+            now = time.perf_counter()
+            if self.profiling and now - last_progress >= PROGRESS_INTERVAL:
+                last_progress = now
+                elapsed = now - self.started
+                self.stdout.write(f'Row {last_row}: {processed} rows in {elapsed:.1f}s ({processed / elapsed:,.0f} rows/sec)')
+
+        elapsed = time.perf_counter() - self.started
+        if checkpoint:
+            clear_checkpoint(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Import completed successfully! {counters["created"]} tenders created, {counters["updated"]} updated, '
+            f'{counters["unchanged"]} unchanged.'
+        ))
+        self.stdout.write(f'Imported {processed} rows in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:,.0f} rows/sec)')
+
+    def plan_chunks(self, parsed_chunks):
+        """Work out what importing the chunks would change, in one pass over all of them, and write the plan"""
+        parsed = []
+        for _, rows, warnings in parsed_chunks:
+            for warning in warnings:
+                self.stdout.write(self.style.WARNING(warning))
+            parsed += rows
+        total = len(parsed)
+        parsed, unchanged = self.select_changed(parsed)
+
+        with self.profiler.phase('lookups'):
+            self.extend_lookups(parsed)
+        requisitions, tenders, contracts = self.load_existing(parsed)
+        records = [('Requisition', requisitions), ('Tender', tenders), ('Contract', contracts)]
+        labels = self.plan_labels(requisitions, tenders)
+        before = {
+            model: {key: self.plan_fields(instance, labels) for key, instance in instances.items()}
+            for model, instances in records
         }
-        return mapping.get(value)
-
-    def map_responsibility(self, raw_value):
-        if not raw_value:
-            return None
-        value = str(raw_value).strip().upper().replace(' ', '_')
-        mapping = {
-            'PROCUREMENT': 'PROCUREMENT',
-            'FINANCE': 'FINANCE',
-            'LEGAL': 'LEGAL',
-            'USER_DEPT': 'USER_DEPT',
-            'USER_DEPARTMENT': 'USER_DEPT',
-            'ICT': 'ICT',
-            'OTHER': 'OTHER',
+        self.apply_rows(parsed, requisitions, tenders, contracts)
+
+        with self.profiler.phase('write'):
+            lines, summary = [], []
+            for model, instances in records:
+                created = changed = 0
+                for key in sorted(instances, key=str):
+                    after = self.plan_fields(instances[key], labels)
+                    if key not in before[model]:
+                        created += 1
+                        lines.append(f'+ {model} {key}')
+                        continue
+                    diff = [
+                        f'{field} {plan_value(value)} -> {plan_value(after[field])}'
+                        for field, value in before[model][key].items() if after[field] != value
+                    ]
+                    if diff:
+                        changed += 1
+                        lines.append(f'~ {model} {key}: ' + '; '.join(diff))
+                summary.append(f'{model}s: {created} to create, {changed} to change')
+
+            new_lookups = Counter(type(record).__name__ for record in self.planned_records)
+            with open(self.plan_path, 'w', encoding='utf-8') as file:
+                file.write(f'# Import plan: {total} rows, {unchanged} unchanged since the last import\n')
+                for line in summary:
+                    file.write(f'# {line}\n')
+                if new_lookups:
+                    file.write('# New lookups: ' + ', '.join(f'{count} {name}' for name, count in new_lookups.items()) + '\n')
+                for record in self.planned_records:
+                    file.write(f'+ {type(record).__name__} {record}\n')
+                for line in lines:
+                    file.write(line + '\n')
+
+        self.stdout.write(self.style.SUCCESS(f'Plan written to {self.plan_path}. Nothing was imported.'))
+        for line in summary:
+            self.stdout.write(line)
+        self.stdout.write(f'{unchanged} of {total} rows unchanged')
+
+    def plan_labels(self, requisitions, tenders):
+        """Names to show for foreign key ids in a plan, by related model"""
+        def by_id(ids):
+            return {pk: name for name, pk in ids.items()}
+        # A tender can be moving away from a requisition that no row names
+        current = {tender.requisition_id for tender in tenders.values()}
+        requisition_numbers = dict(Requisition.objects.filter(pk__in=current).values_list('id', 'e_requisition_no'))
+        requisition_numbers.update((requisition.pk, number) for number, requisition in requisitions.items() if requisition.pk)
+        return {
+            Region: by_id(self.regions),
+            Department: by_id(self.departments),
+            Division: {pk: 'General' for pk in self.general_divisions.values()},
+            Section: {pk: name for (_, name), (pk, _) in self.sections.items()},
+            Employee: by_id(self.employees),
+            Currency: by_id(self.currencies),
+            Country: by_id(self.countries),
+            ContractStatus: by_id(self.contract_statuses),
+            Requisition: requisition_numbers,
         }
-        return mapping.get(value, 'OTHER')
-
-    def get_or_create_currency(self, raw_value):
-        if not raw_value:
-            return None
-        code = str(raw_value).strip().upper()
-        currency, _ = Currency.objects.get_or_create(code=code, defaults={'name': code})
-        return currency
-
-    def get_or_create_country(self, raw_value):
-        if not raw_value:
-            return None
-        name = str(raw_value).strip()
-        country, _ = Country.objects.get_or_create(name=name)
-        return country
+
+    def plan_fields(self, instance, labels):
+        """The values a plan compares for an instance, with foreign keys shown by name"""
+        values = {}
+        for field in type(instance)._meta.concrete_fields:
+            if field.name in PLAN_SKIPPED_FIELDS:
+                continue
+            value = getattr(instance, field.attname)
+            if field.is_relation:
+                related = getattr(instance, field.name) if field.is_cached(instance) else None
+                if related is not None and related.pk is None:
+                    value = str(related)  # Created by this import
+                elif value is not None:
+                    value = labels.get(field.related_model, {}).get(value, f'#{value}')
+            values[field.name] = value
+        return values
+
+    def preload_lookups(self):
+        """Load every lookup the CSV can refer to into name -> id dictionaries, one query per model"""
+        self.regions = dict(Region.objects.values_list('name', 'id'))
+        self.departments = dict(Department.objects.values_list('name', 'id'))
+        # Sections from the CSV are filed under a 'General' division of their department
+        self.general_divisions = dict(Division.objects.filter(name='General').values_list('department_id', 'id'))
+        self.sections = {
+            (division_id, name): (pk, division_id)
+            for pk, division_id, name in Section.objects.values_list('id', 'division_id', 'name')
+        }
+        self.loa_statuses = dict(LOAStatus.objects.values_list('name', 'id'))
+        self.contract_statuses = dict(ContractStatus.objects.values_list('name', 'id'))
+        self.currencies = dict(Currency.objects.values_list('code', 'id'))
+        self.countries = dict(Country.objects.values_list('name', 'id'))
+        self.users = dict(User.objects.values_list('username', 'id'))
+        self.employees = dict(Employee.objects.values_list('employee_id', 'id'))
+
+    def extend(self, ids, keys, make, select, value=None):
+        """
+        Create the records for keys missing from ids with one bulk_create and add them.
+
+        Records another process created since the lookups were loaded are skipped
+        rather than failing the chunk, so the ids of every missing key are read
+        back with select, which maps keys to (key, id) pairs.
+        """
+        missing = [key for key in dict.fromkeys(keys) if key is not None and key not in ids]
+        if not missing:
+            return
+        records = [make(key) for key in missing]
+        if self.plan_path:
+            # Nothing is written for a plan; new records get placeholder ids below zero
+            for record in records:
+                record.pk = -len(self.planned_records) - 1
+                self.planned_records.append(record)
+            ids.update((key, value(record) if value else record.pk) for key, record in zip(missing, records))
+            return
+
+        model = type(records[0])
+        model.objects.bulk_create(records, ignore_conflicts=True)
+        if model in (Division, Section, Employee):
+            # bulk_create skips post_save, so retire the cached creator roles here
+            bump_role_version_on_commit()
+        ids.update(select(missing))
+        unresolved = [key for key in missing if key not in ids]
+        if unresolved:
+            raise CommandError(f'Could not create {model._meta.verbose_name} {unresolved[0]}: it conflicts with an existing record')
+
+    def extend_lookups(self, parsed):
+        """Create the lookup records, users and employees a chunk refers to that do not exist yet"""
+        self.extend(self.regions, (row.region for row in parsed), lambda name: Region(name=name), select_by(Region, 'name'))
+        self.extend(
+            self.departments, (row.department for row in parsed), lambda name: Department(name=name),
+            select_by(Department, 'name'),
+        )
+
+        sections = [(self.departments[row.department], row.section) for row in parsed if row.department and row.section]
+        self.extend(
+            self.general_divisions, (department_id for department_id, _ in sections),
+            lambda department_id: Division(name='General', department_id=department_id),
+            select_by(Division, 'department_id', name='General'),
+        )
+        self.extend(
+            self.sections, ((self.general_divisions[department_id], name) for department_id, name in sections),
+            lambda key: Section(division_id=key[0], name=key[1]),
+            lambda keys: (
+                ((division_id, name), (pk, division_id)) for pk, division_id, name in Section.objects.filter(
+                    division_id__in={division_id for division_id, _ in keys}, name__in={name for _, name in keys},
+                ).values_list('id', 'division_id', 'name')
+            ),
+            value=lambda section: (section.pk, section.division_id),
+        )
+
+        self.extend(
+            self.loa_statuses, (row.loa_status for row in parsed), lambda name: LOAStatus(name=name),
+            select_by(LOAStatus, 'name'),
+        )
+        self.extend(
+            self.contract_statuses, (row.contract_status for row in parsed), lambda name: ContractStatus(name=name),
+            select_by(ContractStatus, 'name'),
+        )
+        self.extend(
+            self.currencies, (row.currency for row in parsed), lambda code: Currency(code=code, name=code),
+            select_by(Currency, 'code'),
+        )
+        self.extend(self.countries, (row.country for row in parsed), lambda name: Country(name=name), select_by(Country, 'name'))
+
+        # Each person named in the CSV gets a user, an employee and a profile, all keyed by the username
+        people = {}
+        for row in parsed:
+            for name in [row.tender_creator, row.contract_creator, row.user]:
+                if name:
+                    # A new employee takes the department of the first row that names them
+                    people.setdefault(username_for(name), (name, self.departments.get(row.department)))
+        if self.plan_path:
+            self.extend(self.users, people, lambda username: User(username=username), select_by(User, 'username'))
+            self.extend(
+                self.employees, people, lambda username: Employee(employee_id=username, **split_name(people[username][0])),
+                select_by(Employee, 'employee_id'),
+            )
+        else:
+            provision_people(people, self.users, self.employees)
+
+    def employee_pk(self, name):
+        return self.employees[username_for(name)] if name else None
+
+    def resolve(self, row):
+        """Return the requisition, tender and contract values of a ParsedRow with its lookups as ids"""
+        department = self.departments.get(row.department)
+        section, division = None, None
+        if row.section and department:
+            section, division = self.sections[(self.general_divisions[department], row.section)]
+        tender_creator = self.employee_pk(row.tender_creator)
+
+        requisition = {
+            **row.requisition,
+            'region_id': self.regions.get(row.region),
+            'department_id': department,
+            'division_id': division,
+            'section_id': section,
+            'assigned_user_id': self.employee_pk(row.user),
+            'tender_creator_id': tender_creator,
+        }
+        tender = {**row.tender, 'tender_creator_id': tender_creator, 'created_by_id': tender_creator}
+        contract = None
+        if row.contract is not None:
+            contract = {
+                **row.contract,
+                'contract_creator_id': self.employee_pk(row.contract_creator),
+                'contract_currency_id': self.currencies.get(row.currency),
+                'country_of_origin_id': self.countries.get(row.country),
+                'contract_status_id': self.contract_statuses.get(row.contract_status),
+            }
+        return requisition, tender, contract
+
+    def select_changed(self, parsed):
+        """Return the ParsedRows that need applying and the number skipped as unchanged"""
+        # A row identical to the one last imported for its tender is skipped. A tender listed on
+        # several rows stores the fingerprint of each in turn, so its rows are always all applied.
+        # A requisition takes its values from the last row naming it, so once one of its rows has
+        # been written the rows after it are applied too, changed or not.
+        changed = []
+        for row in parsed:
+            if (self.fingerprints.get(row.tender_id) != row.fingerprint
+                    or row.requisition_number in self.written_requisitions):
+                self.fingerprints[row.tender_id] = row.fingerprint
+                self.written_requisitions.add(row.requisition_number)
+                changed.append(row)
+        return changed, len(parsed) - len(changed)
+
+    def import_chunk(self, parsed):
+        """Import a chunk of ParsedRows and return the number of rows (created, updated, unchanged)"""
+        parsed, unchanged = self.select_changed(parsed)
+        if not parsed:
+            return 0, 0, unchanged
+
+        with self.profiler.phase('lookups'):
+            self.extend_lookups(parsed)
+        requisitions, tenders, contracts = self.load_existing(parsed)
+        created = self.apply_rows(parsed, requisitions, tenders, contracts)
+
+        with self.profiler.phase('write'):
+            self.write(Requisition, 'e_requisition_no', requisitions.values())
+            self.write(Tender, 'tender_id', tenders.values())
+            self.write(Contract, 'tender', contracts.values())
+        return created, len(parsed) - created, unchanged
+
+    def load_existing(self, parsed):
+        """Fetch the requisitions, tenders and contracts that rows name, keyed by requisition number and Tender ID"""
+        with self.profiler.phase('load'):
+            requisitions = Requisition.objects.in_bulk({row.requisition_number for row in parsed}, field_name='e_requisition_no')
+            tenders = Tender.objects.in_bulk({row.tender_id for row in parsed}, field_name='tender_id')
+            contracts = {
+                contract.tender.tender_id: contract
+                for contract in Contract.objects.filter(tender__tender_id__in=tenders).select_related('tender')
+            }
+        return requisitions, tenders, contracts
+
+    def apply_rows(self, parsed, requisitions, tenders, contracts):
+        """Apply rows to the instances, adding the ones they create; return the number of tenders created"""
+        with self.profiler.phase('apply'):
+            # Rows are applied in order to the same instances, as an update_or_create per row would,
+            # so a record named twice ends up as the second row leaves it
+            created = 0
+            for row in parsed:
+                requisition_number, tender_id = row.requisition_number, row.tender_id
+                requisition_values, tender_values, contract_values = self.resolve(row)
+                requisition = self.apply(requisitions, requisition_number, requisition_values,
+                                         lambda: Requisition(e_requisition_no=requisition_number))
+                created += tender_id not in tenders
+                tender = self.apply(tenders, tender_id, {**tender_values, 'requisition': requisition, 'source_row_hash': row.fingerprint},
+                                    lambda: Tender(tender_id=tender_id))
+                if contract_values is not None:
+                    self.apply(contracts, tender_id, contract_values, lambda: Contract(tender=tender))
+                if self.verbosity >= 2 and not self.profiling:
+                    self.stdout.write(f'Processed Tender ID: {tender_id}')
+        return created
+
+    def apply(self, instances, key, values, make):
+        """Set values on the instance for key, making it if there is none yet, and work out its derived fields"""
+        instance = instances.get(key)
+        if instance is None:
+            instance = instances[key] = make()
+        for field, value in values.items():
+            setattr(instance, field, value)
+        instance.compute_derived_fields()
+        return instance
+
+    def write(self, model, unique_field, instances):
+        """Insert new instances and update existing ones in one bulk_create"""
+        update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in (unique_field, 'created_at')
+        ]
+        model.objects.bulk_create(
+            instances,
+            batch_size=getattr(settings, 'BULK_UPLOAD_BATCH_SIZE', 500),
+            update_conflicts=True,
+            unique_fields=[unique_field],
+            update_fields=update_fields,
+        )
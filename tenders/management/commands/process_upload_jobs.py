@@ -0,0 +1,37 @@
+"""
+Management command to process queued bulk upload jobs in the background
+Usage: python manage.py process_upload_jobs [--once] [--poll-interval 5]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tenders.jobs import claim_next_job, run_upload_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued bulk upload jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty instead of polling')
+        parser.add_argument('--poll-interval', type=float, default=5, help='Seconds to wait between polls of an empty queue')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Waiting for bulk upload jobs...')
+        while True:
+            close_old_connections()
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            if job.rows_processed:
+                self.stdout.write(self.style.WARNING(f'Resuming {job}, left unfinished by a stopped worker...'))
+            else:
+                self.stdout.write(f'Processing {job}...')
+            run_upload_job(job)
+            style = self.style.SUCCESS if job.status == 'COMPLETED' else self.style.ERROR
+            self.stdout.write(style(f'{job}: {job.result_message}'))
@@ -0,0 +1,145 @@
+"""
+Management command to import Procurement Tracking exports dropped into a watched folder
+Usage: python manage.py watch_tender_imports [imports/] [--once] [--poll-interval 2] [--max-interval 60]
+                                             [--settle 5] [--workers 2]
+
+Exports copied into the folder are picked up by renaming them into processing/,
+which only one watcher can do, imported with import_tenders and moved to done/
+or failed/, with a TenderImportRun recording each import. On PostgreSQL a
+watcher only polls while holding an advisory lock on its database session, so
+however many watchers run, one imports at a time and no file is imported
+twice. A watcher stopped mid-import leaves its file in processing/ and its lock
+is released with its connection; whichever watcher takes the lock next resumes
+the file from its import checkpoint. Other databases have no advisory locks;
+run a single watcher there.
+"""
+import os
+import socket
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from tenders.locks import advisory_lock
+from tenders.management.commands.import_tenders import Command as ImportTendersCommand
+from tenders.models import TenderImportRun
+from tenders.tender_csv import SOURCE_SUFFIXES
+
+PROCESSING, DONE, FAILED = 'processing', 'done', 'failed'
+
+# Advisory lock held by the watcher that is importing
+LOCK_NAME = 'watch_tender_imports'
+
+
+class Command(BaseCommand):
+    help = 'Watch a drop folder and import the Procurement Tracking exports copied into it'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory', nargs='?', default=getattr(settings, 'TENDER_IMPORT_WATCH_DIR', 'imports'),
+            help='Folder to watch; processing/, done/ and failed/ folders are created inside it'
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once no exports are waiting instead of polling')
+        parser.add_argument('--poll-interval', type=float, default=2, help='Seconds to wait after finding an empty folder')
+        parser.add_argument(
+            '--max-interval', type=float, default=60,
+            help='Longest wait between polls; the wait doubles after each empty poll up to this'
+        )
+        parser.add_argument(
+            '--settle', type=float, default=5,
+            help='Seconds a file must go unmodified before it is picked up, so files still being copied are left alone'
+        )
+        parser.add_argument('--workers', type=int, help='Processes parsing rows in parallel for each import')
+
+    def handle(self, *args, **options):
+        self.directory = Path(options['directory'])
+        for folder in (PROCESSING, DONE, FAILED):
+            (self.directory / folder).mkdir(parents=True, exist_ok=True)
+        self.worker = f'{socket.gethostname()}:{os.getpid()}'
+
+        self.stdout.write(f'Watching {self.directory} for tender exports...')
+        interval = options['poll_interval']
+        while True:
+            close_old_connections()
+            with advisory_lock(LOCK_NAME) as acquired:
+                imported = self.poll(options) if acquired else 0
+            if imported:
+                interval = options['poll_interval']
+                continue
+            if options['once']:
+                break
+            time.sleep(interval)
+            interval = min(interval * 2, options['max_interval'])
+
+    def poll(self, options):
+        """Import the files stopped watchers left in processing/, then the new exports; return how many were imported"""
+        imported = 0
+        for path in sorted((self.directory / PROCESSING).iterdir()):
+            if path.is_file():
+                self.process(path, options, resumed=True)
+                imported += 1
+
+        for path in self.ready_files(options['settle']):
+            claimed = self.directory / PROCESSING / f'{timezone.now():%Y%m%d-%H%M%S}-{path.name}'
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue  # Moved away since the folder was listed
+            self.process(claimed, options)
+            imported += 1
+        return imported
+
+    def ready_files(self, settle):
+        """Exports in the folder that have not been modified for settle seconds, in name order"""
+        cutoff = time.time() - settle
+        ready = []
+        for path in sorted(self.directory.iterdir()):
+            # Skip hidden files and the lock files Excel leaves next to open workbooks
+            if path.name.startswith(('.', '~$')) or not path.name.lower().endswith(SOURCE_SUFFIXES):
+                continue
+            try:
+                if path.is_file() and path.stat().st_mtime <= cutoff:
+                    ready.append(path)
+            except FileNotFoundError:
+                continue
+        return ready
+
+    def process(self, path, options, resumed=False):
+        """Import a file from processing/ and move it to done/ or failed/, recording the run"""
+        run = TenderImportRun.objects.create(file_name=path.name, worker=self.worker)
+        if resumed:
+            self.stdout.write(self.style.WARNING(f'Resuming {path.name}, left unfinished by a stopped watcher'))
+            TenderImportRun.objects.filter(file_name=path.name, status='RUNNING').exclude(pk=run.pk).update(
+                status='FAILED', result_message=f'Stopped before finishing; resumed by run #{run.pk}',
+                finished_at=timezone.now(),
+            )
+        self.stdout.write(f'Importing {path.name}...')
+
+        output = StringIO()
+        command = ImportTendersCommand(stdout=output, stderr=output, no_color=True)
+        try:
+            call_command(command, str(path), workers=options['workers'])
+            run.status = 'COMPLETED'
+            run.result_message = (
+                f'{command.counters["created"]} tenders created, {command.counters["updated"]} updated, '
+                f'{command.counters["unchanged"]} unchanged'
+            )
+            folder = DONE
+        except Exception as e:
+            # The import checkpoint is kept, so moving the file back into the folder resumes it
+            run.status = 'FAILED'
+            run.result_message = f'Error importing file: {str(e)}'
+            folder = FAILED
+        run.counters = dict(getattr(command, 'counters', {}))
+        run.log = output.getvalue()
+        run.finished_at = timezone.now()
+        run.save()
+        path.rename(self.directory / folder / path.name)
+
+        style = self.style.SUCCESS if run.status == 'COMPLETED' else self.style.ERROR
+        self.stdout.write(style(f'{run}: {run.result_message}'))
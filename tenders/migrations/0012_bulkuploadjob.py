@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0011_alter_requisition_assigned_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkUploadJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_type', models.CharField(choices=[('region', 'Regions'), ('department', 'Departments'), ('division', 'Divisions'), ('section', 'Sections'), ('loa_status', 'e-Contract Steps'), ('contract_status', 'e-Contract Statuses'), ('employee', 'Employees')], max_length=30)),
+                ('file', models.FileField(upload_to='bulk_uploads/%Y/%m/')),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='QUEUED', max_length=20)),
+                ('total_rows', models.PositiveIntegerField(blank=True, help_text='Estimated number of data rows in the file', null=True)),
+                ('rows_processed', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('result_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_upload_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='tenders_bul_status_a89329_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0012_bulkuploadjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkuploadjob',
+            name='dry_run',
+            field=models.BooleanField(default=False, help_text='Validate every row without importing anything'),
+        ),
+        migrations.AlterField(
+            model_name='bulkuploadjob',
+            name='errors',
+            field=models.JSONField(blank=True, default=list, help_text='Row-level errors as {row, column, error} objects'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0013_bulkuploadjob_dry_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Import that wrote the checkpoint, e.g. import_tenders or bulk_upload:employee', max_length=50)),
+                ('file_hash', models.CharField(help_text='SHA-256 of the imported file', max_length=64)),
+                ('last_row', models.PositiveIntegerField(default=0, help_text='Last row number committed')),
+                ('counters', models.JSONField(blank=True, default=dict)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('source', 'file_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0014_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tender',
+            name='source_row_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Fingerprint of the CSV row last imported into this tender, so unchanged rows are skipped', max_length=64),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0015_tender_source_row_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenderImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(help_text='Name of the file in the processing, done or failed folder', max_length=255)),
+                ('status', models.CharField(choices=[('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='RUNNING', max_length=20)),
+                ('worker', models.CharField(help_text='Host and process ID of the watcher that ran the import', max_length=100)),
+                ('counters', models.JSONField(blank=True, default=dict)),
+                ('result_message', models.TextField(blank=True)),
+                ('log', models.TextField(blank=True, help_text='Output of the import, including row warnings')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
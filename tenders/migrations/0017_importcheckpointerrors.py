@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenders', '0016_tenderimportrun'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='importcheckpoint',
+            name='errors',
+        ),
+        migrations.CreateModel(
+            name='ImportCheckpointErrors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('errors', models.JSONField(default=list, help_text='Row-level errors as {row, column, error} objects')),
+                ('checkpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='error_chunks', to='tenders.importcheckpoint')),
+            ],
+            options={
+                'verbose_name': 'Import checkpoint errors',
+                'verbose_name_plural': 'Import checkpoint errors',
+            },
+        ),
+    ]
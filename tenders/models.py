@@ -6,6 +6,7 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 # Create your models here.
 
@@ -260,11 +261,14 @@ class Requisition(models.Model):
     def __str__(self):
         return f"{self.e_requisition_no}"
 
-    def save(self, *args, **kwargs):
+    def compute_derived_fields(self):
+        """Set the creation deadline; save() calls this, bulk writes must call it themselves"""
         if self.date_assigned:
             deadline_days = getattr(settings, 'REQUISITION_CREATION_DEADLINE_DAYS', 7)
             self.creation_deadline = self.date_assigned + timedelta(days=deadline_days)
 
+    def save(self, *args, **kwargs):
+        self.compute_derived_fields()
         super().save(*args, **kwargs)
 
 
@@ -350,6 +354,10 @@ class Tender(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_tender_records')
+    source_row_hash = models.CharField(
+        max_length=64, blank=True, editable=False,
+        help_text="Fingerprint of the CSV row last imported into this tender, so unchanged rows are skipped"
+    )
 
     class Meta:
         ordering = ['-tender_advert_date', '-created_at']
@@ -357,7 +365,8 @@ class Tender(models.Model):
     def __str__(self):
         return f"{self.tender_id} - {self.tender_description[:50]}"
 
-    def save(self, *args, **kwargs):
+    def compute_derived_fields(self):
+        """Work out the opening, validity and evaluation dates from the dates entered"""
         if not self.tender_creation_date:
             self.tender_creation_date = datetime.now().date()
 
@@ -381,13 +390,15 @@ class Tender(models.Model):
         if self.tender_opening_date and self.tender_evaluation_duration_days is not None:
             self.tender_evaluation_end_date = self.tender_opening_date + timedelta(days=self.tender_evaluation_duration_days)
 
-        if self.tender_evaluation_duration_days is None and self.requisition_id:
+        if self.tender_evaluation_duration_days is None and self.requisition is not None:
             procurement_type = getattr(self.requisition, 'procurement_type', None)
             if procurement_type:
                 self.tender_evaluation_duration_days = 21 if procurement_type == 'QUOTATION' else 30
                 if self.tender_opening_date:
                     self.tender_evaluation_end_date = self.tender_opening_date + timedelta(days=self.tender_evaluation_duration_days)
 
+    def save(self, *args, **kwargs):
+        self.compute_derived_fields()
         super().save(*args, **kwargs)
 
     @staticmethod
@@ -508,7 +519,8 @@ class Contract(models.Model):
         day = min(start_date.day, calendar.monthrange(year, month)[1])
         return start_date.replace(year=year, month=month, day=day)
 
-    def save(self, *args, **kwargs):
+    def compute_derived_fields(self):
+        """Work out the contract and security expiry dates from the commencement date"""
         if self.commencement_date and self.contract_duration and self.contract_duration_measure:
             if self.contract_duration_measure == 'DAYS':
                 self.contract_expiry_date = self.commencement_date + timedelta(days=self.contract_duration)
@@ -523,6 +535,8 @@ class Contract(models.Model):
         if self.commencement_date and self.performance_security_duration_days is not None:
             self.performance_security_expiry_date = self.commencement_date + timedelta(days=self.performance_security_duration_days)
 
+    def save(self, *args, **kwargs):
+        self.compute_derived_fields()
         super().save(*args, **kwargs)
 
 
@@ -590,3 +604,109 @@ class ContractCITCommittee(models.Model):
 
     def __str__(self):
         return f"{self.contract.tender.tender_id} - {self.employee.full_name}"
+
+
+class BulkUploadJob(models.Model):
+    """Bulk upload file queued for processing by the background worker"""
+    UPLOAD_TYPE_CHOICES = [
+        ('region', 'Regions'),
+        ('department', 'Departments'),
+        ('division', 'Divisions'),
+        ('section', 'Sections'),
+        ('loa_status', 'e-Contract Steps'),
+        ('contract_status', 'e-Contract Statuses'),
+        ('employee', 'Employees'),
+    ]
+
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    upload_type = models.CharField(max_length=30, choices=UPLOAD_TYPE_CHOICES)
+    file = models.FileField(upload_to='bulk_uploads/%Y/%m/')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    dry_run = models.BooleanField(default=False, help_text="Validate every row without importing anything")
+    total_rows = models.PositiveIntegerField(null=True, blank=True, help_text="Estimated number of data rows in the file")
+    rows_processed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="Row-level errors as {row, column, error} objects")
+    result_message = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='bulk_upload_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_upload_type_display()} upload #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('COMPLETED', 'FAILED')
+
+    @property
+    def eta_seconds(self):
+        """Seconds until the job is expected to finish, extrapolated from the rate so far"""
+        if self.status != 'RUNNING' or not self.started_at or not self.rows_processed or not self.total_rows:
+            return None
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        remaining = max(self.total_rows - self.rows_processed, 0)
+        return round(elapsed / self.rows_processed * remaining)
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of an interrupted chunked import, so a re-run of the same file resumes where it stopped"""
+    source = models.CharField(max_length=50, help_text="Import that wrote the checkpoint, e.g. import_tenders or bulk_upload:employee")
+    file_hash = models.CharField(max_length=64, help_text="SHA-256 of the imported file")
+    last_row = models.PositiveIntegerField(default=0, help_text="Last row number committed")
+    counters = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['source', 'file_hash']
+
+    def __str__(self):
+        return f"{self.source} {self.file_hash[:12]} (row {self.last_row})"
+
+
+class ImportCheckpointErrors(models.Model):
+    """Row errors found in one committed chunk of a checkpointed import"""
+    checkpoint = models.ForeignKey(ImportCheckpoint, on_delete=models.CASCADE, related_name='error_chunks')
+    errors = models.JSONField(default=list, help_text="Row-level errors as {row, column, error} objects")
+
+    class Meta:
+        verbose_name = "Import checkpoint errors"
+        verbose_name_plural = "Import checkpoint errors"
+
+
+class TenderImportRun(models.Model):
+    """Import of a tracking export picked up from the watched drop folder by watch_tender_imports"""
+    STATUS_CHOICES = [
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    file_name = models.CharField(max_length=255, help_text="Name of the file in the processing, done or failed folder")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='RUNNING')
+    worker = models.CharField(max_length=100, help_text="Host and process ID of the watcher that ran the import")
+    counters = models.JSONField(default=dict, blank=True)
+    result_message = models.TextField(blank=True)
+    log = models.TextField(blank=True, help_text="Output of the import, including row warnings")
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Import of {self.file_name} #{self.pk} ({self.get_status_display()})"
@@ -0,0 +1,80 @@
+"""
+Bulk provisioning of the users, employees and profiles behind people named in imports.
+
+Creating users one at a time fires the post_save handlers in models.py, which
+look up the matching employee and insert a UserProfile for every user.
+provision_people does the same for a whole batch of names: missing users,
+employees and profiles are created with one bulk_create each, bypassing the
+signals and skipping any a concurrent process created first, and the profiles
+are then linked to the employee whose employee_id is their username with a
+single UPDATE.
+"""
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.db.models import Exists, OuterRef, Subquery
+
+from .models import Employee, UserProfile
+from .roles import bump_role_version_on_commit
+
+
+def username_for(name):
+    """Username, and employee ID, given to a person known only by name"""
+    return name.replace(' ', '_').lower()
+
+
+def split_name(name):
+    name_parts = name.split()
+    first_name = name_parts[0] if len(name_parts) > 0 else 'Unknown'
+    last_name = ' '.join(name_parts[1:]) if len(name_parts) > 1 else ''
+    return {'first_name': first_name, 'last_name': last_name}
+
+
+def provision_people(people, users, employees):
+    """
+    Create the users, employees and profiles missing for a batch of people.
+
+    people maps each username to the person's (name, department id); users and
+    employees map usernames to ids and are extended with the missing people.
+    Records another process created in the meantime are skipped rather than
+    failing the batch, and every missing id is read back after the insert.
+    """
+    missing_users = [username for username in people if username not in users]
+    if missing_users:
+        User.objects.bulk_create(
+            [User(username=username, **split_name(people[username][0])) for username in missing_users],
+            ignore_conflicts=True,
+        )
+        users.update(User.objects.filter(username__in=missing_users).values_list('username', 'id'))
+
+    missing_employees = [username for username in people if username not in employees]
+    if missing_employees:
+        Employee.objects.bulk_create([
+            Employee(employee_id=username, **split_name(name), email=f'{username}@kengen.co.ke', department_id=department)
+            for username, (name, department) in people.items() if username not in employees
+        ], ignore_conflicts=True)
+        # bulk_create skips post_save, so retire the cached creator roles here
+        bump_role_version_on_commit()
+        employees.update(Employee.objects.filter(employee_id__in=missing_employees).values_list('employee_id', 'id'))
+
+    unresolved = [username for username in people if username not in users or username not in employees]
+    if unresolved:
+        raise IntegrityError(f'Could not create user or employee {unresolved[0]}: it conflicts with an existing record')
+
+    # Only people with a new user or employee can have a profile missing or left unlinked
+    changed = set(missing_users) | set(missing_employees)
+    if changed:
+        user_ids = [users[username] for username in changed]
+        with_profile = set(UserProfile.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        UserProfile.objects.bulk_create(
+            [UserProfile(user_id=user_id) for user_id in user_ids if user_id not in with_profile], ignore_conflicts=True,
+        )
+        link_profiles(user_ids)
+
+
+def link_profiles(user_ids):
+    """Link the unlinked profiles of these users to the unclaimed employee named by their username; return how many"""
+    username = User.objects.filter(pk=OuterRef(OuterRef('user_id'))).values('username')[:1]
+    employee = Employee.objects.filter(employee_id=Subquery(username), user_account__isnull=True).values('pk')[:1]
+    return UserProfile.objects.filter(user_id__in=user_ids, employee__isnull=True).filter(
+        Exists(employee)
+    ).update(employee=Subquery(employee))
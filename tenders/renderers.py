@@ -0,0 +1,134 @@
+"""
+Python-side row rendering for the tender list.
+
+Each row is formatted once with format_html and cached under a key built
+from the updated_at stamps of the tender and every related record it shows,
+so unchanged rows are served from the cache instead of being re-templated.
+"""
+from django.contrib.humanize.templatetags.humanize import intcomma
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.template.defaultfilters import floatformat
+from django.urls import reverse
+from django.utils.formats import date_format
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+TENDER_ROW_CACHE_ALIAS = 'tender_rows'
+# Bump when the row markup changes so stale cached rows are ignored.
+TENDER_ROW_VERSION = 1
+
+
+def get_tender_row_cache():
+    try:
+        return caches[TENDER_ROW_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _stamp(obj):
+    if obj is None or obj.updated_at is None:
+        return '-'
+    return str(int(obj.updated_at.timestamp() * 1000000))
+
+
+def tender_row_cache_key(tender):
+    requisition = tender.requisition
+    related = [tender.tender_creator, requisition]
+    if requisition is not None:
+        related += [requisition.region, requisition.department, requisition.section]
+    stamps = ':'.join(_stamp(obj) for obj in related)
+    return f'tender-row:v{TENDER_ROW_VERSION}:{tender.pk}:{_stamp(tender)}:{stamps}'
+
+
+def _badge(colour, content):
+    return format_html(
+        '<span class="badge" style="background-color: var({}); color: white;">{}</span>',
+        colour, content
+    )
+
+
+def _date_line(icon, label, value):
+    return format_html(
+        '<div class="mb-1"><small class="text-muted"><i class="bi {}"></i> {}: {}</small></div>',
+        icon, label, date_format(value, 'd M Y')
+    )
+
+
+def render_tender_row(tender):
+    """Render one tender card for tender_list.html"""
+    requisition = tender.requisition
+    detail_url = reverse('tenders:tender_detail', args=[tender.pk])
+
+    badges = []
+    if requisition and requisition.region:
+        badges.append(_badge('--kengen-blue', format_html('<i class="bi bi-geo-alt"></i> {}', requisition.region.name)))
+    if requisition and requisition.department:
+        badges.append(_badge('--kengen-dark-blue', format_html('<i class="bi bi-building"></i> {}', requisition.department.name)))
+    if requisition and requisition.section:
+        badges.append(_badge('--kengen-red', format_html('<i class="bi bi-diagram-3"></i> {}', requisition.section.name)))
+    if tender.procurement_method:
+        badges.append(_badge('--kengen-light-blue', tender.get_procurement_method_display()))
+
+    info = []
+    if tender.tender_creator:
+        info.append(format_html('<i class="bi bi-person"></i> Created by: {}', tender.tender_creator.full_name))
+    if tender.tender_reference_number:
+        info.append(format_html('| <i class="bi bi-hash"></i> Ref: {}', tender.tender_reference_number))
+    if tender.tender_step:
+        info.append(format_html('| <i class="bi bi-flag"></i> Step: {}', tender.get_tender_step_display()))
+
+    dates = []
+    if tender.tender_advert_date:
+        dates.append(_date_line('bi-calendar-plus', 'Advert', tender.tender_advert_date))
+    if tender.tender_closing_date:
+        dates.append(_date_line('bi-calendar-x', 'Closes', tender.tender_closing_date))
+
+    value = ''
+    if requisition and requisition.shopping_cart_amount:
+        value = format_html(
+            '<div class="mt-2"><strong class="text-primary">KSh {}</strong></div>',
+            intcomma(floatformat(requisition.shopping_cart_amount, 2))
+        )
+
+    return format_html(
+        '<div class="col-12"><div class="tender-item"><div class="row">'
+        '<div class="col-lg-9">'
+        '<h5 class="mb-2"><a href="{}" class="text-decoration-none">{}</a></h5>'
+        '<p class="mb-2">{}</p>'
+        '<div class="d-flex flex-wrap gap-2 mb-2">{}</div>'
+        '<div class="small text-muted">{}</div>'
+        '</div>'
+        '<div class="col-lg-3 text-lg-end mt-3 mt-lg-0">{}{}'
+        '<div class="mt-3"><a href="{}" class="btn btn-sm btn-outline-primary">'
+        'View Details <i class="bi bi-arrow-right"></i></a></div>'
+        '</div>'
+        '</div></div></div>\n',
+        detail_url,
+        tender.tender_id,
+        Truncator(tender.tender_description).words(30),
+        mark_safe('\n'.join(badges)),
+        mark_safe('\n'.join(info)),
+        mark_safe(''.join(dates)),
+        value,
+        detail_url,
+    )
+
+
+def render_tender_rows(tenders, cache=None):
+    """Render a chunk of tenders, reusing cached rows and caching the ones rendered now"""
+    if cache is None:
+        cache = get_tender_row_cache()
+    keys = [tender_row_cache_key(tender) for tender in tenders]
+    cached = cache.get_many(keys)
+    missing = {}
+    rows = []
+    for key, tender in zip(keys, tenders):
+        row = cached.get(key)
+        if row is None:
+            row = missing[key] = str(render_tender_row(tender))
+        rows.append(row)
+    if missing:
+        cache.set_many(missing)
+    return ''.join(rows)
@@ -0,0 +1,90 @@
+"""
+Role resolution for employees who may act as tender or contract creators.
+
+Eligibility is decided by the employee's section and division names. Those
+case-insensitive joins are resolved once into a set of employee IDs and kept
+in the default cache, which every process shares, under a role version. Saving
+or deleting an Employee, Section or Division replaces the version, and so do
+the bulk writes that skip signals (bulk uploads and CSV imports), so every
+process stops using the stale IDs at once.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Division, Employee, Section
+
+ROLE_VERSION_KEY = 'tenders:roles:version'
+TENDER_CREATOR_CACHE_KEY = 'tenders:roles:tender_creator_ids'
+CONTRACT_CREATOR_CACHE_KEY = 'tenders:roles:contract_creator_ids'
+
+
+def get_role_cache_timeout():
+    return getattr(settings, 'ROLE_CACHE_TIMEOUT', 300)
+
+
+def get_role_version():
+    """Return the current role version, starting a new one if the cache has none"""
+    version = cache.get(ROLE_VERSION_KEY)
+    if version is None:
+        cache.add(ROLE_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(ROLE_VERSION_KEY)
+    return version
+
+
+def bump_role_version():
+    """
+    Start a new role version so cached creator IDs are resolved again.
+
+    Each version is a fresh random token rather than a counter, so two
+    processes bumping at once can never both land on a version that already
+    has IDs cached under it.
+    """
+    cache.set(ROLE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def bump_role_version_on_commit():
+    """Bump the role version once the current transaction commits, so no process caches the old rows under it"""
+    transaction.on_commit(bump_role_version)
+
+
+def _resolve_ids(cache_key, **filters):
+    cache_key = f'{cache_key}:{get_role_version()}'
+    ids = cache.get(cache_key)
+    if ids is None:
+        ids = frozenset(Employee.objects.filter(**filters).values_list('id', flat=True))
+        cache.set(cache_key, ids, get_role_cache_timeout())
+    return ids
+
+
+def get_tender_creator_ids():
+    """Return the IDs of employees eligible to create tenders"""
+    return _resolve_ids(
+        TENDER_CREATOR_CACHE_KEY,
+        section__name__iexact=getattr(settings, 'TENDER_CREATOR_SECTION', 'tenders'),
+        section__division__name__iexact=getattr(settings, 'TENDER_CREATOR_DIVISION', 'procurement'),
+    )
+
+
+def get_contract_creator_ids():
+    """Return the IDs of employees eligible to create contracts"""
+    return _resolve_ids(
+        CONTRACT_CREATOR_CACHE_KEY,
+        section__name__icontains=getattr(settings, 'CONTRACT_CREATOR_SECTION', 'contract'),
+        section__division__name__iexact=getattr(settings, 'CONTRACT_CREATOR_DIVISION', 'compliance & reporting'),
+    )
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+@receiver(post_save, sender=Division)
+@receiver(post_delete, sender=Division)
+def clear_role_caches(sender, **kwargs):
+    """Retire cached creator IDs whenever the organisational structure changes"""
+    bump_role_version_on_commit()
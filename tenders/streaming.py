@@ -0,0 +1,48 @@
+"""
+Streamed rendering for list pages with large result sets.
+
+The page template is rendered once with a marker where the table rows go.
+Everything before the marker is sent straight away, then the rows are
+rendered in chunks from a server-side cursor, then the rest of the page.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+ROWS_MARKER = '<!-- tenders:stream-rows -->'
+
+
+def get_stream_chunk_size():
+    return getattr(settings, 'LIST_STREAM_CHUNK_SIZE', 200)
+
+
+def render_rows_template(template_name, context_name):
+    """Return a chunk renderer that renders template_name with the chunk as context_name"""
+    template = get_template(template_name)
+
+    def render_rows(chunk):
+        return template.render({context_name: chunk})
+
+    return render_rows
+
+
+def stream_list_response(request, template_name, context, queryset, render_rows):
+    """Render template_name around queryset, streaming the rows through render_rows one chunk at a time"""
+    chunk_size = get_stream_chunk_size()
+    page = render_to_string(template_name, {**context, 'rows_marker': mark_safe(ROWS_MARKER)}, request=request)
+    head, _, tail = page.partition(ROWS_MARKER)
+
+    def render_page():
+        yield head
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield render_rows(chunk)
+        yield tail
+
+    return StreamingHttpResponse(render_page(), content_type='text/html; charset=utf-8')
@@ -0,0 +1,343 @@
+"""
+Reading and parsing of rows from the Procurement Tracking export.
+
+read_rows streams the rows of the export as dictionaries of text, whether it
+comes as CSV, gzip or bzip2 compressed CSV, or XLSX. TenderRowParser turns a
+row into a ParsedRow: lookups stay as names and every other value is
+converted to the Python value of its model field. Neither touches the
+database or imports the models, so import_tenders can run the parser in a
+pool of worker processes while a single process does the writing.
+"""
+import bz2
+import csv
+import gzip
+import hashlib
+import io
+import shutil
+import tempfile
+from collections import namedtuple
+from datetime import date, datetime, time
+
+from openpyxl import load_workbook
+
+from .dates import parse_date, parse_time
+
+ParsedRow = namedtuple('ParsedRow', [
+    # Lookup names, resolved to ids by the writer
+    'region', 'department', 'section', 'loa_status', 'contract_status', 'currency', 'country',
+    'tender_creator', 'contract_creator', 'user',
+    # Field values, with contract None when the row has no contract
+    'requisition_number', 'requisition', 'tender_id', 'tender', 'contract',
+    # Hash of the raw row, stored on the tender to skip the row when it is imported again unchanged
+    'fingerprint',
+])
+
+
+def clean_name(value):
+    """Strip a lookup name from the CSV, returning None when it is blank"""
+    return value.strip() if value and value.strip() else None
+
+
+# Exports picked from a directory given to import_tenders
+SOURCE_SUFFIXES = ('.csv', '.csv.gz', '.csv.bz2', '.xlsx')
+
+
+def decompress(file):
+    """Wrap a binary file in a gzip or bzip2 reader if its first bytes say it is compressed"""
+    magic = file.peek(3)[:3]
+    if magic[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=file)
+    if magic == b'BZh':
+        return bz2.BZ2File(file)
+    return file
+
+
+def read_rows(file):
+    """Yield the rows of a CSV or XLSX export as dictionaries keyed by header, from a binary file"""
+    stream = decompress(file)
+    if stream.peek(4)[:4] == b'PK\x03\x04':
+        if stream is file and file.seekable():
+            yield from read_xlsx_rows(file)
+            return
+        # A workbook is a zip archive, which is read from the end; spool a pipe or decompressed stream to disk first
+        with tempfile.TemporaryFile() as spool:
+            shutil.copyfileobj(stream, spool)
+            spool.seek(0)
+            yield from read_xlsx_rows(spool)
+        return
+
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Leave the caller's file open, e.g. standard input; an abandoned import may already have closed it
+        if not text.closed:
+            text.detach()
+
+
+def read_xlsx_rows(file):
+    """Yield the rows of the first sheet of a workbook, read with openpyxl in read-only mode"""
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = ['' if value is None else str(value) for value in next(rows, ())]
+        for row in rows:
+            if any(value is not None for value in row):
+                yield dict(zip(headers, map(cell_text, row)))
+    finally:
+        wb.close()
+
+
+def cell_text(value):
+    """Write a cell value as the CSV export would, so both go through the same parsing"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, time):
+        return value.strftime('%H:%M')
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def parse_file(path):
+    """Read and parse a whole export; return its ParsedRows and any warnings"""
+    with open(path, 'rb') as file:
+        return parse_rows(read_rows(file))
+
+
+def row_fingerprint(row):
+    """SHA-256 of a CSV row dictionary, independent of the column order"""
+    # DictReader files any extra cells under a None key
+    content = repr(sorted((str(column), value) for column, value in row.items()))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def parse_rows(rows):
+    """Parse a chunk of CSV row dictionaries; return the ParsedRows and any warnings"""
+    parser = TenderRowParser()
+    return [parser.parse(row) for row in rows], parser.warnings
+
+
+class TenderRowParser:
+    """Converts Procurement Tracking CSV rows, collecting warnings for values it cannot read"""
+
+    def __init__(self):
+        self.warnings = []
+
+    def parse(self, row):
+        """Convert one CSV row into a ParsedRow"""
+        # Parse dates
+        tender_creation_date = self.parse_date(row.get('Tender Creation Date'))
+        proposed_advert_date = self.parse_date(row.get('Proposed Advert Date'))
+        tender_advert_date = self.parse_date(row.get('Tender Advert Date'))
+        tender_closing_date = self.parse_date(row.get('Tender Closing Date'))
+        tender_validity_expiry_date = self.parse_date(row.get('Tender Validity Expiry Date'))
+
+        # Parse time
+        tender_closing_time = self.parse_time(row.get('Tender Closing Time'))
+
+        # Extract tender ID from the "Tender ID : 38" format
+        tender_id_raw = row.get('Tender ID', '')
+        tender_id_clean = tender_id_raw.split(':')[-1].strip() if ':' in tender_id_raw else tender_id_raw
+        tender_id = self.parse_int(tender_id_clean) or 0
+
+        tender_reference_number = row.get('Tender Reference Number') or row.get('eGP Tender Reference') or row.get('KenGen Tender Reference') or ''
+        eligibility = (row.get('Eligibility') or 'OPEN').strip().upper()
+        agpo_category = (row.get('AGPO') or '').strip().upper() or None
+        tender_approval_status = (row.get('Tender Approval status') or '').strip().upper().replace(' ', '_') or None
+        tender_step = (row.get('Tender Step') or '').strip().upper().replace(' ', '_') or None
+        tender_validity_days = self.parse_int(row.get('Tender Validity(days)'))
+        procurement_method = self.map_procurement_method(row.get('Procurement Method') or row.get('Procurement Type'))
+
+        requisition_number = row.get('Requisition Number') or None
+        if not requisition_number:
+            requisition_number = f"REQ-{tender_id}"
+
+        shopping_cart_no = self.parse_int(row.get('Shopping Cart'))
+        shopping_cart_amount = self.parse_decimal(row.get('Shopping Cart Amount')) or 0
+        shopping_cart_status_raw = (row.get('Shopping cart status') or '').strip().upper()
+        shopping_cart_status = shopping_cart_status_raw.replace(' ', '_') or 'PENDING'
+        requisition_description = row.get('Requisition Description') or row.get('Tender Description') or ''
+        date_assigned = self.parse_date(row.get('Date Assigned')) or tender_advert_date or datetime.today().date()
+
+        procurement_type_raw = (row.get('Procurement Type') or '').strip().upper()
+        procurement_type = 'QUOTATION' if 'QUOTATION' in procurement_type_raw else 'TENDER'
+
+        requisition = {
+            'requisition_description': requisition_description,
+            'shopping_cart_no': shopping_cart_no or 0,
+            'shopping_cart_amount': shopping_cart_amount,
+            'shopping_cart_status': shopping_cart_status,
+            'procurement_type': procurement_type,
+            'date_assigned': date_assigned,
+        }
+
+        tender = {
+            'tender_reference_number': tender_reference_number,
+            'tender_creation_date': tender_creation_date or tender_advert_date or datetime.today().date(),
+            'tender_description': row.get('Tender Description') or '',
+            'eligibility': 'AGPO' if eligibility == 'AGPO' else 'OPEN',
+            'agpo_category': agpo_category if eligibility == 'AGPO' else None,
+            'procurement_method': procurement_method,
+            'proposed_advert_date': proposed_advert_date,
+            'tender_advert_date': tender_advert_date,
+            'tender_closing_date': tender_closing_date,
+            'tender_closing_time': tender_closing_time,
+            'tender_validity_days': tender_validity_days,
+            'tender_validity_expiry_date': tender_validity_expiry_date,
+            'tender_evaluation_duration_days': self.parse_int(row.get('Tender Evaluation Duration(30/21 Days)')),
+            'tender_approval_status': tender_approval_status,
+            'tender_step': tender_step,
+        }
+
+        contract_number = self.parse_int(row.get('Contract number'))
+        contract_title = row.get('Contract title') or None
+        contract_value = self.parse_decimal(row.get('Contract Value'))
+        contractor_supplier = row.get('Contractor/Supplier') or None
+
+        contract = None
+        if contract_number or contract_title or contract_value or contractor_supplier:
+            contract = {
+                'contract_number': contract_number,
+                'contract_title': contract_title,
+                'contract_duration_measure': self.map_duration_measure(row.get('Contract duration measure')),
+                'contract_duration': self.parse_int(row.get('Contract duration')),
+                'commencement_date': self.parse_date(row.get('Commencement date')),
+                'contract_value': contract_value,
+                'contractor_supplier': contractor_supplier,
+                'tender_security_amount': self.parse_decimal(row.get('Tender Security Amount')),
+                'tender_security_validity_days': self.parse_int(row.get('Tender Security validity (days)')),
+                'contract_step': self.map_contract_step(row.get('Contract Step')),
+                'responsibility': self.map_responsibility(row.get('Responsibility')),
+                'contract_delivery_period': self.parse_int(row.get('Contract Delivery Period')),
+                'performance_security_amount': self.parse_decimal(row.get('Performance Security Amount')),
+                'performance_security_duration_days': self.parse_int(row.get('Performance Security Duration (Days)')),
+                'e_purchase_order_no': row.get('eGP Purchase order No') or None,
+                'sap_purchase_order_no': row.get('SAP Purchase Order No') or None,
+            }
+
+        contract_currency = row.get('Contract Currency')
+        country_of_origin = row.get('Country of Origin')
+        return ParsedRow(
+            region=clean_name(row.get('Region')),
+            department=clean_name(row.get('Department ')),  # Note the space in CSV
+            section=clean_name(row.get('Section')),
+            loa_status=clean_name(row.get('LOA (Letter of Award status)')),
+            contract_status=clean_name(row.get('e-Contract Status')),
+            currency=str(contract_currency).strip().upper() if contract_currency else None,
+            country=str(country_of_origin).strip() if country_of_origin else None,
+            tender_creator=clean_name(row.get('Tender Creator')),
+            contract_creator=clean_name(row.get('Contract Creator')),
+            user=clean_name(row.get('User')),
+            requisition_number=requisition_number,
+            requisition=requisition,
+            tender_id=tender_id,
+            tender=tender,
+            contract=contract,
+            fingerprint=row_fingerprint(row),
+        )
+
+    def parse_date(self, date_str):
+        """Parse various date formats"""
+        value = parse_date(date_str)
+        if value is None and date_str and date_str.strip():
+            self.warnings.append(f'Could not parse date: {date_str}')
+        return value
+
+    def parse_time(self, time_str):
+        """Parse time format"""
+        value = parse_time(time_str)
+        if value is None and time_str and time_str.strip():
+            self.warnings.append(f'Could not parse time: {time_str.strip()}')
+        return value
+
+    def parse_decimal(self, value_str):
+        """Parse decimal values"""
+        if not value_str or value_str.strip() == '':
+            return None
+        
+        try:
+            # Remove commas and convert to decimal
+            clean_value = value_str.strip().replace(',', '')
+            return float(clean_value)
+        except ValueError:
+            self.warnings.append(f'Could not parse decimal: {value_str}')
+            return None
+
+    def map_procurement_method(self, raw_value):
+        if not raw_value:
+            return None
+        value = str(raw_value).strip().upper()
+        if 'QUOTATION' in value:
+            return 'REQUEST_FOR_QUOTATION'
+        if 'DIRECT' in value:
+            return 'DIRECT_PROCUREMENT'
+        if 'RESTRICTED' in value:
+            return 'RESTRICTED_TENDER'
+        if 'OPEN' in value:
+            return 'OPEN_TENDER'
+        if 'PROPOSAL' in value:
+            return 'REQUEST_FOR_PROPOSAL'
+        if 'EXPRESSION' in value:
+            return 'EXPRESSION_OF_INTEREST'
+        if 'PREQUAL' in value:
+            return 'PREQUALIFICATION'
+        if 'FRAMEWORK' in value:
+            return 'FRAMEWORK'
+        return None
+
+    def parse_int(self, value_str):
+        """Parse integer values"""
+        if not value_str or value_str.strip() == '':
+            return None
+
+        try:
+            clean_value = value_str.strip().replace(',', '')
+            return int(float(clean_value))
+        except ValueError:
+            self.warnings.append(f'Could not parse int: {value_str}')
+            return None
+
+    def map_duration_measure(self, raw_value):
+        if not raw_value:
+            return None
+        value = str(raw_value).strip().upper()
+        if 'DAY' in value:
+            return 'DAYS'
+        if 'MONTH' in value:
+            return 'MONTHS'
+        if 'YEAR' in value:
+            return 'YEARS'
+        return None
+
+    def map_contract_step(self, raw_value):
+        if not raw_value:
+            return None
+        value = str(raw_value).strip().upper().replace(' ', '_')
+        mapping = {
+            'DRAFT': 'DRAFT',
+            'ACTIVE': 'ACTIVE',
+            'AWARDED': 'AWARDED',
+            'SIGNED': 'SIGNED',
+            'CLOSED': 'CLOSED',
+        }
+        return mapping.get(value)
+
+    def map_responsibility(self, raw_value):
+        if not raw_value:
+            return None
+        value = str(raw_value).strip().upper().replace(' ', '_')
+        mapping = {
+            'PROCUREMENT': 'PROCUREMENT',
+            'FINANCE': 'FINANCE',
+            'LEGAL': 'LEGAL',
+            'USER_DEPT': 'USER_DEPT',
+            'USER_DEPARTMENT': 'USER_DEPT',
+            'ICT': 'ICT',
+            'OTHER': 'OTHER',
+        }
+        return mapping.get(value, 'OTHER')
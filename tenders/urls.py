@@ -20,6 +20,7 @@ urlpatterns = [
     path('requisitions/', views.requisition_list, name='requisition_list'),
     path('requisitions/add/', views.requisition_create, name='requisition_create'),
     path('requisitions/<int:pk>/edit/', views.requisition_edit, name='requisition_edit'),
+    path('requisitions/employee-options/', views.employee_options, name='employee_options'),
     
     # Contract URLs
     path('tenders/<int:tender_pk>/contract/add/', views.contract_create, name='contract_create'),
@@ -45,6 +46,8 @@ urlpatterns = [
     path('custom-admin/bulk-upload/loa-status/', admin_views.bulk_upload_loa_status, name='bulk_upload_loa_status'),
     path('custom-admin/bulk-upload/contract-status/', admin_views.bulk_upload_contract_status, name='bulk_upload_contract_status'),
     path('custom-admin/bulk-upload/employee/', admin_views.bulk_upload_employee, name='bulk_upload_employee'),
+    path('custom-admin/bulk-upload/jobs/<int:job_id>/status/', admin_views.bulk_upload_job_status, name='bulk_upload_job_status'),
+    path('custom-admin/bulk-upload/jobs/<int:job_id>/errors.csv', admin_views.bulk_upload_job_errors, name='bulk_upload_job_errors'),
     
     # User-Employee Management
     path('custom-admin/user-employee-links/', admin_views.manage_user_employee_links, name='manage_user_employee_links'),
@@ -1,5 +1,8 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_GET
 from django.contrib import messages
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
@@ -12,9 +15,13 @@ from .models import (
 from .forms import (
     TenderForm, TenderOpeningCommitteeFormSet, 
     TenderEvaluationCommitteeFormSet, EmployeeForm,
-    ContractForm, ContractCITCommitteeFormSet, RequisitionForm
+    ContractForm, ContractCITCommitteeFormSet, RequisitionForm,
+    get_employee_ordered_queryset, get_employee_options_limit, filter_employees_by_org, search_employees,
+    prefetch_model_choices
 )
 from .auth_forms import SignUpForm
+from .renderers import render_tender_rows
+from .streaming import render_rows_template, stream_list_response
 
 # Create your views here.
 
@@ -152,8 +159,8 @@ def tender_list(request):
     """List all tenders with filters"""
     tenders = Tender.objects.select_related(
         'requisition', 'requisition__region', 'requisition__department',
-        'requisition__division', 'requisition__section', 'tender_creator'
-    ).prefetch_related('contract').all()
+        'requisition__section', 'tender_creator'
+    ).all()
     
     # Filters
     search_query = request.GET.get('search', '')
@@ -196,7 +203,7 @@ def tender_list(request):
     tenders = tenders.order_by('-tender_advert_date', '-created_at')
     
     context = {
-        'tenders': tenders,
+        'tender_count': tenders.count(),
         'regions': regions,
         'departments': departments,
         'procurement_methods': procurement_methods,
@@ -209,7 +216,7 @@ def tender_list(request):
         'loa_status_filter': loa_status_filter,
         'contract_status_filter': contract_status_filter,
     }
-    return render(request, 'tenders/tender_list.html', context)
+    return stream_list_response(request, 'tenders/tender_list.html', context, tenders, render_tender_rows)
 
 
 @login_required
@@ -259,12 +266,15 @@ def employee_list(request):
     departments = Department.objects.all()
     
     context = {
-        'employees': employees,
+        'employee_count': employees.count(),
         'departments': departments,
         'department_filter': department_filter,
         'search_query': search_query,
     }
-    return render(request, 'tenders/employee_list.html', context)
+    return stream_list_response(
+        request, 'tenders/employee_list.html', context, employees,
+        render_rows_template('tenders/partials/employee_rows.html', 'employees')
+    )
 
 
 @login_required
@@ -353,14 +363,47 @@ def requisition_list(request):
         requisitions = requisitions.filter(department_id=department_filter)
 
     departments = Department.objects.all()
+    requisitions = requisitions.order_by('-created_at')
 
     context = {
-        'requisitions': requisitions.order_by('-created_at'),
+        'has_requisitions': requisitions.exists(),
         'departments': departments,
         'department_filter': department_filter,
         'search_query': search_query,
     }
-    return render(request, 'tenders/requisition_list.html', context)
+    return stream_list_response(
+        request, 'tenders/requisition_list.html', context, requisitions,
+        render_rows_template('tenders/partials/requisition_rows.html', 'requisitions')
+    )
+
+
+@login_required
+@user_passes_test(can_create_edit_tenders)
+@require_GET
+@cache_control(private=True, max_age=getattr(settings, 'EMPLOYEE_OPTIONS_MAX_AGE', 300))
+def employee_options(request):
+    """JSON list of employees under a department, division or section, or all of them, matching q"""
+    department_id = request.GET.get('department', '')
+    division_id = request.GET.get('division', '')
+    section_id = request.GET.get('section', '')
+    for value in (department_id, division_id, section_id):
+        if value and not value.isdigit():
+            return JsonResponse({'error': 'Invalid organisation id'}, status=400)
+
+    limit = get_employee_options_limit()
+    employees = list(search_employees(
+        filter_employees_by_org(get_employee_ordered_queryset(), department_id, division_id, section_id),
+        request.GET.get('q', '').strip(),
+    ).values_list('id', 'first_name', 'last_name', 'employee_id')[:limit + 1])
+
+    return JsonResponse({
+        'employees': [
+            {'id': pk, 'label': f"{first_name} {last_name} ({employee_id})"}
+            for pk, first_name, last_name, employee_id in employees[:limit]
+        ],
+        # More employees match than were returned; a narrower search finds them
+        'truncated': len(employees) > limit,
+    })
 
 
 @login_required
@@ -421,6 +464,7 @@ def tender_create(request):
         form = TenderForm(request.POST)
         opening_formset = TenderOpeningCommitteeFormSet(request.POST)
         evaluation_formset = TenderEvaluationCommitteeFormSet(request.POST)
+        prefetch_model_choices([form, *opening_formset.forms, *evaluation_formset.forms])
         
         if form.is_valid() and opening_formset.is_valid() and evaluation_formset.is_valid():
             tender = form.save(commit=False)
@@ -461,6 +505,7 @@ def tender_edit(request, pk):
         form = TenderForm(request.POST, instance=tender)
         opening_formset = TenderOpeningCommitteeFormSet(request.POST, instance=tender)
         evaluation_formset = TenderEvaluationCommitteeFormSet(request.POST, instance=tender)
+        prefetch_model_choices([form, *opening_formset.forms, *evaluation_formset.forms])
         
         if form.is_valid() and opening_formset.is_valid() and evaluation_formset.is_valid():
             tender = form.save(commit=False)
@@ -546,6 +591,7 @@ def contract_create(request, tender_pk):
     if request.method == 'POST':
         form = ContractForm(request.POST)
         cit_formset = ContractCITCommitteeFormSet(request.POST)
+        prefetch_model_choices([form, *cit_formset.forms])
         
         if form.is_valid() and cit_formset.is_valid():
             contract = form.save(commit=False)
@@ -585,6 +631,7 @@ def contract_edit(request, tender_pk):
     if request.method == 'POST':
         form = ContractForm(request.POST, instance=contract)
         cit_formset = ContractCITCommitteeFormSet(request.POST, instance=contract)
+        prefetch_model_choices([form, *cit_formset.forms])
         
         if form.is_valid() and cit_formset.is_valid():
             contract = form.save(commit=False)